@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from dataclasses import (
+    dataclass,
+    field
+)
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple
+)
+
+from fim import settings
+
+logger = settings.getLogger(__name__)
+
+
+if TYPE_CHECKING:
+    from fim.models import BaseFlaskModel
+    from pymongo.collection import Collection
+    from pymongo.database import Database
+
+
+@dataclass
+class QueryShape:
+    """
+    Representative query issued by an API. Only the shape of the filter and
+    sort matters to the query planner, so the values can be placeholders.
+    """
+    name: str
+    filter: Dict = field(default_factory=dict)
+    sort: Optional[List[Tuple[str, int]]] = None
+    projection: Optional[Dict] = None
+    # Whether the API also counts the matches, e.g. for the page total
+    count: bool = False
+
+
+@dataclass
+class QueryShapeReport:
+    """
+    Result of explaining a single query shape.
+    """
+    collection: str
+    shape: QueryShape
+    stages: List[str] = field(default_factory=list)
+    indexes: List[str] = field(default_factory=list)
+
+    @property
+    def collscan(self) -> bool:
+        return 'COLLSCAN' in self.stages
+
+    @property
+    def blocking_sort(self) -> bool:
+        return 'SORT' in self.stages
+
+
+def _collect_plan(plan: Dict, stages: List[str], indexes: List[str]) -> None:
+    """
+    Walk an explain plan tree and collect its stage and index names.
+    """
+    if stage := plan.get('stage'):
+        stages.append(stage)
+    if index_name := plan.get('indexName'):
+        indexes.append(index_name)
+
+    for value in plan.values():
+        if isinstance(value, dict):
+            _collect_plan(value, stages, indexes)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    _collect_plan(item, stages, indexes)
+
+
+def _winning_plans(explain: Dict) -> List[Dict]:
+    """
+    Find the winning plans in an explain output. Aggregations nest them in
+    their `$cursor` stage, finds report them at the top level.
+    """
+    plans = []
+
+    for key, value in explain.items():
+        if key == 'winningPlan' and isinstance(value, dict):
+            plans.append(value)
+        elif key == 'rejectedPlans':
+            continue
+        elif isinstance(value, dict):
+            plans.extend(_winning_plans(value))
+        elif isinstance(value, list):
+            plans.extend(plan for item in value if isinstance(item, dict) for plan in _winning_plans(item))
+
+    return plans
+
+
+def explain_query_shape(collection: Collection, shape: QueryShape) -> QueryShapeReport:
+    """
+    Run a query shape through `explain()` and report the winning plan. When
+    the shape is counted, the `count_documents` pipeline is explained too.
+    """
+    cursor = collection.find(shape.filter, shape.projection)
+    if shape.sort:
+        cursor = cursor.sort(shape.sort)
+
+    explains = [cursor.explain()]
+    if shape.count:
+        # NOTE: This is the pipeline `count_documents` runs
+        pipeline = [{'$match': shape.filter}, {'$group': {'_id': 1, 'n': {'$sum': 1}}}]
+        explains.append(
+            collection.database.command(
+                'explain',
+                {'aggregate': collection.name, 'pipeline': pipeline, 'cursor': {}},
+                verbosity='queryPlanner'
+            )
+        )
+
+    report = QueryShapeReport(collection=collection.name, shape=shape)
+    for explain in explains:
+        for winning_plan in _winning_plans(explain):
+            _collect_plan(winning_plan, report.stages, report.indexes)
+
+    return report
+
+
+def list_query_shapes(
+    model: BaseFlaskModel,
+    order_on: Iterable[str],
+    filters: Optional[Dict] = None,
+    name: str = 'list'
+) -> List[QueryShape]:
+    """
+    Query shapes of a list API for every ordering it accepts, built through
+    the model's `QueryInterface` the same way `BaseListAPI` builds its
+    queryset, so they are the queries the API actually sends.
+    """
+    queryset = model.query.filter(**filters) if filters else model.query.all()
+
+    response_fields = model.response_fields()
+    if response_fields:
+        queryset = queryset.only(*response_fields)
+
+    shapes = []
+    for order_field in order_on:
+        ordered = queryset.order_by(field=order_field)
+        shapes.append(
+            QueryShape(
+                name=f'{name} ordered by {order_field}',
+                filter=ordered.query,
+                sort=ordered.sort,
+                projection=ordered.projection,
+                count=True
+            )
+        )
+
+    return shapes
+
+
+def advise_indexes(database: Database, query_shapes: Dict[str, List[QueryShape]]) -> List[QueryShapeReport]:
+    """
+    Explain every query shape and log the ones that scan the whole collection
+    or sort in memory. Returns the reports for the flagged shapes.
+    """
+    flagged = []
+
+    for collection_name, shapes in query_shapes.items():
+        collection = getattr(database, collection_name)
+
+        for shape in shapes:
+            report = explain_query_shape(collection, shape)
+
+            if report.collscan:
+                logger.warning('[%s] COLLSCAN for query shape "%s": %s', collection_name, shape.name, shape.filter)
+            elif report.blocking_sort:
+                logger.warning('[%s] In-memory SORT for query shape "%s": %s', collection_name, shape.name, shape.sort)
+            else:
+                logger.info('[%s] Query shape "%s" uses %s', collection_name, shape.name, ', '.join(report.indexes))
+                continue
+
+            flagged.append(report)
+
+    return flagged
@@ -12,15 +12,21 @@ from fim.authentication import (
     BaseAuthentication,
     protected_view
 )
-from fim.constants import SortDirectionEnum
+from fim.constants import (
+    PaginationModeEnum,
+    SearchSourceEnum,
+    SortDirectionEnum
+)
 from fim.interface import (
-    ElasticsearchQuerySet,
+    CursorPaginatedElasticsearchQuerySet,
+    CursorPaginatedQuerySet,
     PaginatedElasticsearchQuerySet,
     PaginatedQuerySet,
     QuerySet
 )
 from fim.models import BaseFlaskModel
 from fim.schemas import (
+    BadRequestResponseSchema,
     BaseBulkCreateResponseSchema,
     BaseBulkDeleteRequestSchema,
     BaseBulkDeleteResponseSchema,
@@ -34,10 +40,7 @@ from fim.schemas import (
     InternalServerErrorResponseSchema,
     NotFoundResponseSchema
 )
-from flask import (
-    g,
-    jsonify
-)
+from flask import jsonify
 from flask.views import MethodView
 
 logger = settings.getLogger(__name__)
@@ -58,23 +61,31 @@ class BaseCreateAPI(MethodView):
     model: BaseFlaskModel = None
     index: str            = None
 
-    def _generate_new_obj(self, body: request_body_schema, user: Dict = None, relate_user: bool = True) -> model:
+    def _get_new_obj_data(self, body: request_body_schema, user: Dict = None, relate_user: bool = True) -> Dict:
         """
-        Generate a new object for the given model
+        Prepare the data used to create a new object for the given model
         """
-        subject_model = self.__class__.model
-        new_obj_data  = body.model_dump()
+        new_obj_data = body.model_dump()
 
         if relate_user:
             new_obj_data['user_id'] = user['id']
 
+        return new_obj_data
+
+    def _generate_new_obj(self, body: request_body_schema, user: Dict = None, relate_user: bool = True) -> model:
+        """
+        Generate a new object for the given model
+        """
+        subject_model = self.__class__.model
+        new_obj_data  = self._get_new_obj_data(body=body, user=user, relate_user=relate_user)
+
         new_obj = subject_model.create(**new_obj_data)
 
         return new_obj
 
     @protected_view
     def post(self, body: request_body_schema) -> Tuple[jsonify, HTTPStatus]:
-        user: Dict = getattr(g, 'user', self.__class__.authentication_class.user)
+        user: Dict = self.__class__.authentication_class.for_request().user
 
         try:
             # TODO: Add permissions here
@@ -108,24 +119,26 @@ class BaseBulkCreateAPI(BaseCreateAPI):
 
     @protected_view
     def post(self, body: request_body_schema) -> Tuple[jsonify, HTTPStatus]:
-        user     = getattr(g, 'user', self.__class__.authentication_class.user)
-        new_objs = list()
+        user = self.__class__.authentication_class.for_request().user
 
         try:
             index = getattr(self.__class__, 'index', None)
 
             # TODO: Add permissions here
-            for item in body.items:
-                new_obj = self._generate_new_obj(body=item, user=user)
-                new_objs.append(new_obj)
+            new_objs_data    = [self._get_new_obj_data(body=item, user=user) for item in body.items]
+            new_objs, errors = self.__class__.model.bulk_create(new_objs_data)
 
-                if index:
-                    new_obj.add_to_index(index=index)
+            if index and new_objs:
+                self.__class__.model.add_many_to_index(index=index, objs=new_objs)
+
+            if errors and not new_objs:
+                err_msg = f'No new {self.__class__.model.__name__} objects could be created'
+                return jsonify(BadRequestResponseSchema(message=err_msg).dict()), HTTPStatus.BAD_REQUEST
 
             response_message = f'new {self.__class__.model.__name__} objects created successfully'
             response_data    = [obj.model_dump() for obj in new_objs]
 
-            return jsonify(self.__class__.response_schema(message=response_message, data=response_data).dict()), HTTPStatus.CREATED
+            return jsonify(self.__class__.response_schema(message=response_message, data=response_data, errors=errors).dict()), HTTPStatus.CREATED
 
         except Exception:
             err_msg = f'Error creating new {self.__class__.model.__name__} objects'
@@ -148,27 +161,49 @@ class BaseSearchAPI(MethodView):
     model: BaseFlaskModel = None
     index: str            = None
 
+    # Query parameters that control pagination rather than the search itself
+    pagination_fields = ('page', 'per_page', 'pagination_mode', 'cursor')
+
+    # What is fetched from Elasticsearch for every hit: the whole `document`,
+    # only the response `fields`, or only the `ids` with the documents
+    # loaded from MongoDB
+    search_source: str = SearchSourceEnum.Document.value
+
     def _get_pagination_from_request(self, query: request_query_schema) -> Dict:
+        if query.cursor or query.pagination_mode == PaginationModeEnum.Cursor.value:
+            return {'per_page': query.per_page, 'cursor': query.cursor}
+
         return {'page': query.page, 'per_page': query.per_page}
 
-    def _get_queryset(self, query: request_query_schema) -> Union[ElasticsearchQuerySet, PaginatedElasticsearchQuerySet]:
+    def _get_queryset(self, query: request_query_schema) -> Union[PaginatedElasticsearchQuerySet, CursorPaginatedElasticsearchQuerySet]:
         """
-        Get a queryset for the given model using Elasticsearch
+        Get a page of search results for the given model, paginated by
+        Elasticsearch
         """
-        user = getattr(g, 'user', self.__class__.authentication_class.user)
+        user = self.__class__.authentication_class.for_request().user
         subject_model = self.__class__.model
 
-        search_query = {k: v for k, v in query.dict().items() if v and k not in ['page', 'per_page']}
+        search_query = {k: v for k, v in query.dict().items() if v and k not in self.__class__.pagination_fields}
         if not search_query:
             raise ValueError('Query must contain at least one search term')
 
         if hasattr(subject_model, 'user'):
             search_query['user_id'] = str(user['id'])
 
-        initial_queryset: ElasticsearchQuerySet = subject_model.es_query.search(query=search_query)
+        pagination = self._get_pagination_from_request(query=query)
 
-        pagination                  = self._get_pagination_from_request(query=query)
-        queryset: PaginatedElasticsearchQuerySet = initial_queryset.paginate(**pagination)
+        if 'cursor' in pagination:
+            queryset: CursorPaginatedElasticsearchQuerySet = subject_model.es_query.seek(
+                query=search_query,
+                source=self.__class__.search_source,
+                **pagination
+            )
+        else:
+            queryset: PaginatedElasticsearchQuerySet = subject_model.es_query.paginate(
+                query=search_query,
+                source=self.__class__.search_source,
+                **pagination
+            )
 
         return queryset
 
@@ -179,19 +214,16 @@ class BaseSearchAPI(MethodView):
 
         try:
             queryset: PaginatedElasticsearchQuerySet = self._get_queryset(query=query)
+        except ValueError as e:
+            return jsonify(BadRequestResponseSchema(message=str(e)).dict()), HTTPStatus.BAD_REQUEST
         except Exception as e:
             err_msg = f'Error building {self.__class__.model.__name__} queryset: {e}'
             logger.exception(err_msg)
 
             return jsonify(InternalServerErrorResponseSchema(message=err_msg).dict()), HTTPStatus.INTERNAL_SERVER_ERROR
 
-        response_data = [obj.model_dump() for obj in queryset.items]
-        pagination_data = {
-            'total': queryset.total,
-            'pages': queryset.pages,
-            'next_page': queryset.next_page,
-            'prev_page': queryset.prev_page
-        }
+        response_data   = [obj.model_dump() for obj in queryset.items]
+        pagination_data = queryset.pagination
 
         return jsonify(self.__class__.response_schema(data=response_data, pagination=pagination_data).dict(exclude_none=True)), HTTPStatus.OK
 
@@ -212,6 +244,9 @@ class BaseListAPI(MethodView):
     default_ordering_field: str = ''
     default_ordering_dir: str   = SortDirectionEnum.Ascending.value
 
+    # Use a cached approximate total instead of counting on every page
+    approximate_count: bool = False
+
     def _get_ordering_from_request(self, query: request_query_schema) -> [str, str]:
         """
         Prepare the ordering for the queryset
@@ -222,6 +257,9 @@ class BaseListAPI(MethodView):
         return direction, ordering_field
 
     def _get_pagination_from_request(self, query: request_query_schema) -> Dict:
+        if query.cursor or query.pagination_mode == PaginationModeEnum.Cursor.value:
+            return {'per_page': query.per_page, 'cursor': query.cursor}
+
         return {'page': query.page, 'per_page': query.per_page}
 
     def _get_filters_from_request(self, query: request_query_schema) -> List:
@@ -235,11 +273,11 @@ class BaseListAPI(MethodView):
 
         return filters
 
-    def _get_queryset(self, query: request_query_schema) -> Union[QuerySet, PaginatedQuerySet]:
+    def _get_queryset(self, query: request_query_schema) -> Union[QuerySet, PaginatedQuerySet, CursorPaginatedQuerySet]:
         """
         Get a queryset for the given model
         """
-        user          = getattr(g, 'user', self.__class__.authentication_class.user)
+        user          = self.__class__.authentication_class.for_request().user
         subject_model = self.__class__.model
 
         if hasattr(subject_model, 'user'):
@@ -247,9 +285,12 @@ class BaseListAPI(MethodView):
         else:
             initial_queryset: QuerySet = subject_model.query.all()
 
+        response_fields = subject_model.response_fields()
+        if response_fields:
+            initial_queryset = initial_queryset.only(*response_fields)
+
         direction, ordering_field = self._get_ordering_from_request(query=query)
-        if ordering_field:
-            initial_queryset.order_by(field=ordering_field, direction=direction)
+        initial_queryset          = initial_queryset.order_by(field=ordering_field, direction=direction)
 
         pagination = self._get_pagination_from_request(query=query)
         filters    = self._get_filters_from_request(query=query)
@@ -257,7 +298,10 @@ class BaseListAPI(MethodView):
         if filters:
             initial_queryset = initial_queryset.filter(**filters)
 
-        queryset: PaginatedQuerySet = initial_queryset.paginate(**pagination)
+        if 'cursor' in pagination:
+            queryset: CursorPaginatedQuerySet = initial_queryset.seek(**pagination)
+        else:
+            queryset: PaginatedQuerySet = initial_queryset.paginate(**pagination, approximate_count=self.__class__.approximate_count)
 
         return queryset
 
@@ -265,19 +309,16 @@ class BaseListAPI(MethodView):
     def get(self, query: request_query_schema) -> Tuple[jsonify, HTTPStatus]:
         try:
             queryset: PaginatedQuerySet = self._get_queryset(query=query)
+        except ValueError as e:
+            return jsonify(BadRequestResponseSchema(message=str(e)).dict()), HTTPStatus.BAD_REQUEST
         except Exception:
             err_msg = f'Error building {self.__class__.model.__name__} queryset'
             logger.exception(err_msg)
 
             return jsonify(InternalServerErrorResponseSchema(message=err_msg).dict()), HTTPStatus.INTERNAL_SERVER_ERROR
 
-        response_data = [obj.model_dump() for obj in queryset.items]
-        pagination_data = {
-            'total': queryset.total,
-            'pages': queryset.pages,
-            'next_page': queryset.next_page,
-            'prev_page': queryset.prev_page
-        }
+        response_data   = [obj.model_dump() for obj in queryset.items]
+        pagination_data = queryset.pagination
 
         return jsonify(self.__class__.response_schema(data=response_data, pagination=pagination_data).dict(exclude_none=True)), HTTPStatus.OK
 
@@ -298,19 +339,19 @@ class BaseDetailAPI(MethodView):
     model: BaseFlaskModel = None
     index: str            = None
 
-    def _get_instance(self, pk: int) -> model:
-        user          = getattr(g, 'user', self.__class__.authentication_class.user)
+    def _get_instance(self, pk: int, only: List[str] = None) -> model:
+        user          = self.__class__.authentication_class.for_request().user
         subject_model = self.__class__.model
-        instance      = subject_model.query.get(pk=pk)
+        filters       = {'pk': pk}
 
-        if hasattr(subject_model, 'user') and instance and not instance.user_id == user['id']:
-            return None
+        if hasattr(subject_model, 'user'):
+            filters['user_id'] = user['id']
 
-        return instance
+        return subject_model.query.get(only=only, **filters)
 
     @protected_view
     def get(self, query: request_query_schema) -> Tuple[jsonify, HTTPStatus]:
-        obj = self._get_instance(pk=query.id)
+        obj = self._get_instance(pk=query.id, only=self.__class__.model.response_fields())
 
         if not obj:
             err_msg = f'{self.__class__.model.__name__} with id {query.id} not found'
@@ -330,11 +371,11 @@ class BaseDetailAPI(MethodView):
             setattr(obj, field, value)
 
         try:
-            self.__class__.model.save(obj)
+            changed_fields = self.__class__.model.save(obj)
 
             index = getattr(self.__class__, 'index', None)
-            if index:
-                obj.update_index(index=index)
+            if index and changed_fields:
+                obj.update_index(index=index, fields=changed_fields)
 
         except Exception:
             err_msg = f'Error updating {self.__class__.model.__name__} object with id {query.id}'
@@ -378,12 +419,13 @@ class BaseBulkDeleteAPI(MethodView):
     response_schema: pydantic.BaseModel     = BaseBulkDeleteResponseSchema
 
     model: BaseFlaskModel = None
+    index: str            = None
 
     def _get_queryset(self, body: request_body_schema) -> Union[QuerySet, PaginatedQuerySet]:
         """
         Get a queryset for the given model
         """
-        user          = getattr(g, 'user', self.__class__.authentication_class.user)
+        user          = self.__class__.authentication_class.for_request().user
         subject_model = self.__class__.model
 
         if hasattr(subject_model, 'user'):
@@ -396,17 +438,27 @@ class BaseBulkDeleteAPI(MethodView):
     @protected_view
     def delete(self, body: request_body_schema) -> Tuple[jsonify, HTTPStatus]:
         queryset: QuerySet = self._get_queryset(body=body)
-
-        if not queryset.count():
-            err_msg = f'No {self.__class__.model.__name__} objects found'
-            return jsonify(NotFoundResponseSchema(message=err_msg).dict()), HTTPStatus.NOT_FOUND
+        index              = getattr(self.__class__, 'index', None)
 
         try:
-            queryset.delete()
+            if index:
+                # The ObjectIds are needed to remove the documents from the index
+                ids = queryset.ids()
+                deleted_count = queryset.filter(_id=ids).delete() if ids else 0
+
+                if deleted_count:
+                    self.__class__.model.remove_many_from_index(index=index, ids=ids)
+            else:
+                deleted_count = queryset.delete()
+
         except Exception:
             err_msg = f'Error deleting {self.__class__.model.__name__} objects'
             logger.exception(err_msg)
 
             return jsonify(InternalServerErrorResponseSchema(message=err_msg).dict()), HTTPStatus.INTERNAL_SERVER_ERROR
 
-        return jsonify(self.__class__.response_schema().dict()), HTTPStatus.RESET_CONTENT
+        if not deleted_count:
+            err_msg = f'No {self.__class__.model.__name__} objects found'
+            return jsonify(NotFoundResponseSchema(message=err_msg).dict()), HTTPStatus.NOT_FOUND
+
+        return jsonify(self.__class__.response_schema(deleted=deleted_count).dict()), HTTPStatus.RESET_CONTENT
@@ -1,3 +1,4 @@
+import hashlib
 from abc import (
     ABC,
     abstractmethod
@@ -10,11 +11,30 @@ from typing import (
     Optional
 )
 
+from fim import settings
 from fim.schemas import UnauthorizedResponseSchema
-from flask import jsonify
+from flask import (
+    g,
+    jsonify
+)
 from flask.wrappers import Response as FlaskResponse
 
 
+def hash_token(token_key: str) -> str:
+    """
+    Hash an API token so it can be used as a cache key without keeping the
+    token itself around.
+    """
+    return hashlib.sha256(token_key.encode('utf-8')).hexdigest()
+
+
+def revoked_token_cache_key(token_hash: str) -> str:
+    """
+    Redis key marking a token as revoked for every service
+    """
+    return f'{settings.REVOKED_TOKEN_CACHE_PREFIX}:{token_hash}'
+
+
 def protected_view(view_method):
     @wraps(view_method)
     def wrapper(*args, **kwargs):
@@ -23,7 +43,7 @@ def protected_view(view_method):
         if not auth_class:
             return jsonify({'message': 'No authentication class found'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
-        auth = auth_class()
+        auth = auth_class.for_request()
         if not auth.authenticated:
             return auth.response
 
@@ -40,16 +60,14 @@ def superuser_view(view_method):
         if not auth_class:
             return jsonify({'message': 'No authentication class found'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
-        auth = auth_class()
-        if auth.user:
-            if not auth.user.is_superuser:
-                auth.authenticated = False
-                response_body = UnauthorizedResponseSchema(message='This endpoint is for superusers only').dict()
-                auth.response = jsonify(response_body), HTTPStatus.UNAUTHORIZED
-
-        elif not auth.user or not auth.authenticated:
+        auth = auth_class.for_request()
+        if not auth.user or not auth.authenticated:
             return auth.response
 
+        if not auth.user.is_superuser:
+            response_body = UnauthorizedResponseSchema(message='This endpoint is for superusers only').dict()
+            return jsonify(response_body), HTTPStatus.UNAUTHORIZED
+
         return view_method(*args, **kwargs)
 
     return wrapper
@@ -57,12 +75,32 @@ def superuser_view(view_method):
 
 @dataclass
 class BaseAuthentication(ABC):
+    """
+    Authentication result for a single request. The request is validated
+    when the instance is created; use `for_request` so it only happens once
+    per request, however many protected views the request passes through.
+    """
     authenticated: bool = True
     response: Optional[FlaskResponse] = None
 
     user: Optional[Dict] = None
 
+    def __post_init__(self):
+        self.validate_request()
+
     @classmethod
+    def for_request(cls) -> 'BaseAuthentication':
+        """
+        Return the authentication of the current request, validating it on
+        the first call and reusing the result stored on `flask.g` after.
+        """
+        authentications = g.setdefault('_authentications', {})
+
+        if cls not in authentications:
+            authentications[cls] = cls()
+
+        return authentications[cls]
+
     @abstractmethod
-    def validate_request(cls):
+    def validate_request(self) -> None:
         raise NotImplementedError('Calling from the base class')
@@ -4,3 +4,14 @@ from enum import Enum
 class SortDirectionEnum(str, Enum):
     Ascending = 'asc'
     Descending = 'desc'
+
+
+class PaginationModeEnum(str, Enum):
+    Offset = 'offset'
+    Cursor = 'cursor'
+
+
+class SearchSourceEnum(str, Enum):
+    Document = 'document'
+    Fields = 'fields'
+    Ids = 'ids'
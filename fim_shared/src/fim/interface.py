@@ -1,27 +1,54 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import dataclasses
+import datetime
+import hashlib
+import math
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import (
     TYPE_CHECKING,
     Generic,
     Optional,
-    TypeVar
+    Type,
+    TypeVar,
+    Union
 )
 
-from fim.settings import getLogger
+from bson import (
+    ObjectId,
+    json_util
+)
+from fim import settings
+from fim.constants import (
+    SearchSourceEnum,
+    SortDirectionEnum
+)
 from pydantic import (
     BaseModel,
     Field
 )
+from pymongo import (
+    ASCENDING,
+    DESCENDING
+)
 
-logger = getLogger(__name__)
+logger = settings.getLogger(__name__)
 
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import (
+        Iterable,
+        Iterator
+    )
 
+    from elasticsearch import Elasticsearch
     from fim.models import BaseFlaskModel
     from fim.schemas import FIMObjectID
+    from pymongo.cursor import Cursor
 
 
 T = TypeVar('T', bound=BaseModel)
@@ -29,74 +56,378 @@ T = TypeVar('T', bound=BaseModel)
 
 # region MongoDB Interface
 
-@dataclass
+def merge_queries(*queries: dict) -> dict:
+    """
+    Combine MongoDB filter documents, falling back to `$and` when the same
+    field is constrained more than once.
+    """
+    queries = [query for query in queries if query]
+    merged  = {}
+
+    for query in queries:
+        if merged.keys() & query.keys():
+            return {'$and': queries}
+
+        merged.update(query)
+
+    return merged
+
+
+# Types a sort value decoded from a pagination cursor may have
+CURSOR_VALUE_TYPES = (bool, int, float, str, ObjectId, datetime.datetime)
+
+
+def _encode_token(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode('utf-8')).decode('utf-8').rstrip('=')
+
+
+def _decode_token(token: str) -> dict:
+    padded = token + '=' * (-len(token) % 4)
+    return json_util.loads(base64.urlsafe_b64decode(padded.encode('utf-8')))
+
+
+def encode_cursor(sort: list[tuple[str, int]], values: list) -> str:
+    """
+    Encode the sort specification and the sort values of the last item on a
+    page into an opaque, URL safe continuation token.
+    """
+    return _encode_token({'s': sort, 'v': values})
+
+
+def decode_cursor(token: str) -> tuple[list[tuple[str, int]], list]:
+    """
+    Decode a continuation token created by `encode_cursor`.
+    """
+    try:
+        payload = _decode_token(token)
+        sort    = [tuple(spec) for spec in payload['s']]
+        values  = list(payload['v'])
+    except (binascii.Error, KeyError, TypeError, ValueError):
+        raise ValueError('Invalid pagination cursor')
+
+    # The cursor comes from the client and its values end up in the seek
+    # query, so anything that could be read as an operator is refused
+    if not all(value is None or isinstance(value, CURSOR_VALUE_TYPES) for value in values):
+        raise ValueError('Invalid pagination cursor')
+
+    return sort, values
+
+
+def encode_search_cursor(pit_id: str, values: list, query_digest: str) -> str:
+    """
+    Encode an Elasticsearch point in time and the `search_after` values of
+    the last hit on a page into an opaque, URL safe continuation token.
+    """
+    return _encode_token({'p': pit_id, 'v': values, 'q': query_digest})
+
+
+def decode_search_cursor(token: str) -> tuple[str, list, str]:
+    """
+    Decode a continuation token created by `encode_search_cursor`.
+    """
+    try:
+        payload = _decode_token(token)
+
+        return str(payload['p']), list(payload['v']), str(payload['q'])
+    except (binascii.Error, KeyError, TypeError, ValueError):
+        raise ValueError('Invalid pagination cursor')
+
+
+def seek_condition(field: str, direction: int, value) -> Optional[dict]:
+    """
+    Build the condition matching documents that sort strictly after `value`.
+    MongoDB sorts nulls first, but comparison operators never match them, so
+    they need to be handled explicitly.
+    """
+    if direction == ASCENDING:
+        return {field: {'$ne': None}} if value is None else {field: {'$gt': value}}
+
+    if value is None:
+        return None
+
+    return {'$or': [{field: {'$lt': value}}, {field: None}]}
+
+
 class QuerySet(Generic[T]):
     """
-    Custom dataclass to represent a MongoDB queryset (emmulating an ORM like Django).
+    Lazy MongoDB queryset (emmulating an ORM like Django).
+
+    Calls to filter/exclude/order_by/limit/offset/only only build up the query
+    spec. A single cursor is run when the queryset is iterated, counted,
+    sliced or paginated.
     """
-    items: list[T] = Field(default_factory=list)
+
+    def __init__(
+        self,
+        model: Type[BaseFlaskModel],
+        query: Optional[dict] = None,
+        sort: Optional[list[tuple[str, int]]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        projection: Optional[dict] = None
+    ):
+        self.model      = model
+        self.query      = query or {}
+        self.sort       = sort or []
+        self.skip       = skip
+        self.limit_to   = limit
+        self.projection = projection
+
+        self._result_cache: Optional[list[T]] = None
 
     def __len__(self) -> int:
-        return len(self.items)
+        return len(self._fetch_all())
 
-    def __getitem__(self, index: int) -> T:
-        return self.items[index]
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, 'QuerySet[T]']:
+        if self._result_cache is not None:
+            return self._result_cache[index]
 
-    def __iter__(self) -> Iterable[T]:
-        return iter(self.items)
+        if isinstance(index, slice):
+            if index.step not in (None, 1) or (index.start or 0) < 0 or (index.stop or 0) < 0:
+                raise ValueError('QuerySet slicing only supports positive bounds without a step')
+
+            start = index.start or 0
+            limit = index.stop - start if index.stop is not None else 0
+            if index.stop is not None and limit <= 0:
+                return self._clone(items=[])
+
+            return self.offset(start).limit(limit) if limit else self.offset(start)
+
+        if index < 0:
+            raise IndexError('Negative indexing is not supported on an unevaluated QuerySet')
+
+        items = list(self.offset(index).limit(1))
+        if not items:
+            raise IndexError('QuerySet index out of range')
+
+        return items[0]
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._fetch_all())
+
+    def __bool__(self) -> bool:
+        return bool(self._fetch_all())
 
     def __repr__(self) -> str:
-        if len(self.items) > 5:
-            return f'<QuerySet: {self.items[:5]}...>'
+        items = list(self[:6]) if self._result_cache is None else self._result_cache[:6]
+        if len(items) > 5:
+            return f'<QuerySet: {items[:5]}...>'
         else:
-            return f'<QuerySet: {self.items}>'
+            return f'<QuerySet: {items}>'
 
     def __str__(self) -> str:
         return '<QuerySet>'
 
+    @property
+    def items(self) -> list[T]:
+        return self._fetch_all()
+
+    def _clone(self, items: Optional[list[T]] = None, **overrides) -> 'QuerySet[T]':
+        spec = {
+            'query': self.query,
+            'sort': list(self.sort),
+            'skip': self.skip,
+            'limit': self.limit_to,
+            'projection': self.projection
+        }
+        spec.update(overrides)
+
+        clone = self.__class__(self.model, **spec)
+        clone._result_cache = items
+
+        return clone
+
+    def _cursor(self, batch_size: Optional[int] = None) -> Cursor:
+        cursor = self.model.collection.find(self.query, self.projection)
+
+        if self.sort:
+            cursor = cursor.sort(self.sort)
+        if self.skip:
+            cursor = cursor.skip(self.skip)
+        if self.limit_to:
+            cursor = cursor.limit(self.limit_to)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+
+        return cursor
+
+    def _fetch_all(self) -> list[T]:
+        if self._result_cache is None:
+            self._result_cache = list(self.iterator())
+
+        return self._result_cache
+
+    def iterator(self, batch_size: Optional[int] = None) -> Iterator[T]:
+        """
+        Stream the results from the cursor without caching them, so large
+        scans only hold one batch in memory at a time.
+        """
+        partial = bool(self.projection)
+
+        for document in self._cursor(batch_size=batch_size):
+            yield self.model.from_document(document, partial=partial)
+
+    def filter(self, **kwargs) -> 'QuerySet[T]':
+        return self._clone(query=merge_queries(self.query, self.model.query.build_query(**kwargs)))
+
+    def exclude(self, **kwargs) -> 'QuerySet[T]':
+        query = {}
+        for field, value in self.model.query.build_query(**kwargs).items():
+            if isinstance(value, dict) and '$in' in value:
+                query[field] = {'$nin': value['$in']}
+            else:
+                query[field] = {'$ne': value}
+
+        return self._clone(query=merge_queries(self.query, query))
+
+    def order_by(self, field: str, direction: str = SortDirectionEnum.Ascending.value) -> 'QuerySet[T]':
+        return self._clone(sort=self.model.query.build_sort(field=field, direction=direction))
+
+    def offset(self, skip: int) -> 'QuerySet[T]':
+        if self.limit_to and skip >= self.limit_to:
+            return self._clone(items=[])
+
+        return self._clone(skip=self.skip + skip, limit=max(self.limit_to - skip, 0) if self.limit_to else 0)
+
+    def limit(self, limit: int) -> 'QuerySet[T]':
+        return self._clone(limit=min(limit, self.limit_to) if self.limit_to else limit)
+
+    def only(self, *fields: str) -> 'QuerySet[T]':
+        return self._clone(projection=self.model.query.build_projection(only=fields))
+
+    def defer(self, *fields: str) -> 'QuerySet[T]':
+        return self._clone(projection=self.model.query.build_projection(defer=fields))
+
     def count(self) -> int:
-        return self.__len__()
+        if self._result_cache is not None:
+            return len(self._result_cache)
+
+        kwargs = {}
+        if self.skip:
+            kwargs['skip'] = self.skip
+        if self.limit_to:
+            kwargs['limit'] = self.limit_to
+
+        return self.model.collection.count_documents(self.query, **kwargs)
+
+    def exists(self) -> bool:
+        return self.first() is not None
 
     def first(self) -> Optional[T]:
-        return self.items[0] if self.items else None
+        if self._result_cache is not None:
+            return self._result_cache[0] if self._result_cache else None
+
+        items = list(self.limit(1))
+        return items[0] if items else None
 
     def last(self) -> Optional[T]:
-        return self.items[-1] if self.items else None
+        if self._result_cache is not None:
+            return self._result_cache[-1] if self._result_cache else None
+
+        if self.skip or self.limit_to:
+            items = self._fetch_all()
+            return items[-1] if items else None
+
+        sort  = self.sort or self.model.query.build_sort()
+        items = list(self._clone(sort=[(field, -direction) for field, direction in sort], limit=1))
+
+        return items[0] if items else None
+
+    def paginate(self, page: int, per_page: int, approximate_count: bool = False) -> PaginatedQuerySet[T]:
+        return self.model.query.paginate(
+            query=self.query,
+            sort=self.sort,
+            page=page,
+            per_page=per_page,
+            projection=self.projection,
+            approximate_count=approximate_count
+        )
 
-    def filter(self, **kwargs) -> 'QuerySet[T]':
-        return [item for item in self.items if all(getattr(item, field) == value for field, value in kwargs.items())]
+    def seek(self, per_page: int, cursor: Optional[str] = None) -> CursorPaginatedQuerySet[T]:
+        """
+        Keyset pagination: fetch the page following `cursor` by seeking on the
+        sort fields instead of skipping over the previous pages.
+        """
+        sort = self.sort or self.model.query.build_sort()
+        if self.model.query.tiebreaker not in (field for field, _ in sort):
+            raise ValueError('Keyset pagination requires the tiebreaker in the sort')
 
-    def order_by(self, field: str, direction: str = 'asc') -> 'QuerySet[T]':
-        self.items.sort(key=lambda item: getattr(item, field), reverse=direction.lower() == 'desc')
-        return self
+        query = self.query
+        if cursor:
+            cursor_sort, values = decode_cursor(cursor)
+            if cursor_sort != sort or len(values) != len(sort):
+                raise ValueError('Pagination cursor does not match the requested ordering')
 
-    def paginate(self, page: int, per_page: int) -> PaginatedQuerySet[T]:
-        start = (page - 1) * per_page
-        end   = start + per_page
+            branches = []
+            for position, (field, direction) in enumerate(sort):
+                condition = seek_condition(field, direction, values[position])
+                if condition is None:
+                    continue
 
-        return PaginatedQuerySet(
-            items=self.items[start:end],
-            total=len(self.items),
-            pages=max(len(self.items) // per_page, 1),
-            next_page=page + 1 if end < len(self.items) else None,
-            prev_page=page - 1 if start > 0 else None
-        )
+                equal_fields = {prev_field: values[prev] for prev, (prev_field, _) in enumerate(sort[:position])}
+                branches.append(merge_queries(equal_fields, condition))
 
-    def delete(self) -> None:
-        for item in self.items:
-            item.delete()
+            query = merge_queries(self.query, {'$or': branches} if branches else {'_id': {'$exists': False}})
+
+        projection = self.projection
+        if projection and any(projection.values()):
+            # The sort values of the last item are needed to build the cursor
+            projection = {**projection, **{field: 1 for field, _ in sort}}
+
+        items       = list(self._clone(query=query, sort=sort, skip=0, limit=per_page + 1, projection=projection))
+        next_cursor = None
+
+        if len(items) > per_page:
+            items       = items[:per_page]
+            last_item   = items[-1]
+            values      = [getattr(last_item, 'id' if field == '_id' else field) for field, _ in sort]
+            next_cursor = encode_cursor(sort=sort, values=values)
+
+        return CursorPaginatedQuerySet(items=items, next_cursor=next_cursor)
+
+    def ids(self) -> list[FIMObjectID]:
+        """
+        Fetch only the ObjectIds of the matching documents.
+        """
+        return [document['_id'] for document in self._clone(projection={'_id': 1})._cursor()]
+
+    def delete(self) -> int:
+        """
+        Delete every matching document with a single `delete_many` and return
+        the number of deleted documents.
+        """
+        query = self.query
+        if self.skip or self.limit_to:
+            # delete_many has no skip/limit, so resolve the window to ids first
+            query = {'_id': {'$in': self.ids()}}
+
+        result = self.model.collection.delete_many(query)
+        self._result_cache = None
+
+        return result.deleted_count
 
 
 @dataclass
-class PaginatedQuerySet(QuerySet):
+class PaginatedQuerySet(Generic[T]):
     """
-    Custom dataclass to represent a paginated MongoDB QuerySet.
+    Custom dataclass to represent a single evaluated page of a MongoDB QuerySet.
     """
+    items: list[T] = dataclasses.field(default_factory=list)
+
     total: int = 0
     pages: int = 0
     next_page: Optional[int] = None
     prev_page: Optional[int] = None
 
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, index: int) -> T:
+        return self.items[index]
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
     def __repr__(self) -> str:
         if len(self.items) > 5:
             return f'<PaginatedQuerySet: {self.items[:5]}...>'
@@ -106,16 +437,129 @@ class PaginatedQuerySet(QuerySet):
     def __str__(self) -> str:
         return '<PaginatedQuerySet>'
 
+    @classmethod
+    def from_page(cls, items: list[T], total: int, page: int, per_page: int) -> 'PaginatedQuerySet[T]':
+        """
+        Build a paginated queryset from a single page of items and the total
+        number of documents matching the query.
+        """
+        return cls(
+            items=items,
+            total=total,
+            pages=max(math.ceil(total / per_page), 1),
+            next_page=page + 1 if page * per_page < total else None,
+            prev_page=page - 1 if page > 1 else None
+        )
+
+    @property
+    def pagination(self) -> dict:
+        return {
+            'total': self.total,
+            'pages': self.pages,
+            'next_page': self.next_page,
+            'prev_page': self.prev_page
+        }
+
+    def count(self) -> int:
+        return self.__len__()
+
+    def first(self) -> Optional[T]:
+        return self.items[0] if self.items else None
+
+    def last(self) -> Optional[T]:
+        return self.items[-1] if self.items else None
+
+
+@dataclass
+class CursorPaginatedQuerySet(PaginatedQuerySet):
+    """
+    Custom dataclass to represent a page of a MongoDB QuerySet fetched with
+    keyset pagination.
+    """
+    next_cursor: Optional[str] = None
+
+    def __repr__(self) -> str:
+        if len(self.items) > 5:
+            return f'<CursorPaginatedQuerySet: {self.items[:5]}...>'
+        else:
+            return f'<CursorPaginatedQuerySet: {self.items}>'
+
+    def __str__(self) -> str:
+        return '<CursorPaginatedQuerySet>'
+
+    @property
+    def pagination(self) -> dict:
+        return {'next_cursor': self.next_cursor}
+
 
 class QueryInterface:
 
     def __init__(self, model):
-        self.model = model
+        self.model        = model
+        self._count_cache = OrderedDict()
 
     def __repr__(self) -> str:
         return f'<QueryInterface for {self.model.__name__}>'
 
-    def get(self, **kwargs) -> Optional[BaseFlaskModel]:
+    @property
+    def tiebreaker(self) -> str:
+        """
+        Unique field used to make a sort order deterministic.
+        """
+        return 'pk' if 'pk' in self.model.model_fields else '_id'
+
+    def build_query(self, **kwargs) -> dict:
+        """
+        Translate keyword arguments into a MongoDB filter document.
+        """
+        query = {}
+        for field, value in kwargs.items():
+            if isinstance(value, list):
+                query[field] = {'$in': value}
+            else:
+                query[field] = value
+
+        if 'id' in query:
+            query['pk'] = query.pop('id')
+
+        return query
+
+    def build_sort(self, field: str = '', direction: str = SortDirectionEnum.Ascending.value) -> list[tuple[str, int]]:
+        """
+        Translate an ordering field and direction into a MongoDB sort
+        specification, using the tiebreaker to keep pages stable. Raises a
+        ValueError for fields the model does not have, since keyset
+        pagination reads the sort values back from the last item.
+        """
+        sort_dir = DESCENDING if direction == SortDirectionEnum.Descending.value else ASCENDING
+
+        if field and field != '_id' and field not in self.model.model_fields:
+            raise ValueError(f'Cannot order {self.model.__name__} by unknown field: {field}')
+
+        if field == 'id':
+            field = 'pk'
+
+        sort = [(field, sort_dir)] if field else []
+        if field != self.tiebreaker:
+            sort.append((self.tiebreaker, sort_dir))
+
+        return sort
+
+    def build_projection(self, only: Iterable[str] = None, defer: Iterable[str] = None) -> Optional[dict]:
+        """
+        Translate `only` (fields to load) or `defer` (fields to skip) into a
+        MongoDB projection document.
+        """
+        if only and defer:
+            raise ValueError('Only one of `only` and `defer` can be provided')
+
+        fields = only or defer
+        if not fields:
+            return None
+
+        return {'pk' if field == 'id' else field: 1 if only else 0 for field in fields}
+
+    def get(self, only: Iterable[str] = None, defer: Iterable[str] = None, **kwargs) -> Optional[BaseFlaskModel]:
         """
         Find a single document based on keyword arguments.
         """
@@ -123,50 +567,92 @@ class QueryInterface:
         if 'id' in query:
             query['pk'] = query.pop('id')
 
-        document = self.model.collection.find_one(query)
-        data     = self.model(**document) if document else None
+        projection = self.build_projection(only=only, defer=defer)
+        document   = self.model.collection.find_one(query, projection)
+        data       = self.model.from_document(document, partial=bool(projection)) if document else None
 
         return data
 
-    def find_by_id(self, id: FIMObjectID) -> Optional[BaseFlaskModel]:
+    def find_by_id(self, id: FIMObjectID, only: Iterable[str] = None, defer: Iterable[str] = None) -> Optional[BaseFlaskModel]:
         """
         Find a document by its ObjectId and return it as an instance of its
         corresponding model.
         """
-        document = self.model.collection.find_one({'_id': id})
+        projection = self.build_projection(only=only, defer=defer)
+        document   = self.model.collection.find_one({'_id': id}, projection)
         if not document:
             return None
 
-        return self.model(**document)
+        return self.model.from_document(document, partial=bool(projection))
 
-    def filter(self, **kwargs) -> QuerySet[BaseFlaskModel]:
+    def filter(self, only: Iterable[str] = None, defer: Iterable[str] = None, **kwargs) -> QuerySet[BaseFlaskModel]:
         """
-        Perform a filter operation based on keyword arguments.
+        Lazily perform a filter operation based on keyword arguments.
         """
-        query = {}
-        for field, value in kwargs.items():
-            if isinstance(value, list):
-                query[field] = {'$in': value}
-            else:
-                query[field] = value
-
-        if 'id' in query:
-            query['pk'] = query.pop('id')
+        return QuerySet(self.model, query=self.build_query(**kwargs), projection=self.build_projection(only=only, defer=defer))
 
-        documents = self.model.collection.find(query)
-        data      = [self.model(**document) for document in documents]
+    def all(self, only: Iterable[str] = None, defer: Iterable[str] = None) -> QuerySet[BaseFlaskModel]:
+        """
+        Lazily find all documents in a collection and return them as instances
+        of their corresponding models.
+        """
+        return QuerySet(self.model, projection=self.build_projection(only=only, defer=defer))
 
-        return QuerySet(data)
+    def count(self, query: Optional[dict] = None) -> int:
+        """
+        Count the documents matching a MongoDB filter on the server.
+        """
+        return self.model.collection.count_documents(query or {})
 
-    def all(self) -> QuerySet[BaseFlaskModel]:
+    def cached_count(self, query: Optional[dict] = None) -> int:
         """
-        Find all documents in a collection and return them as instances of their
-        corresponding models.
+        Approximate count of the documents matching a MongoDB filter, cached
+        in-process for `PAGINATION_COUNT_CACHE_SECONDS`.
+        """
+        query = query or {}
+        if not query:
+            return self.model.collection.estimated_document_count()
+
+        cache_key = json_util.dumps(query, sort_keys=True)
+        cached    = self._count_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        total = self.count(query)
+
+        self._count_cache[cache_key] = (time.monotonic() + settings.PAGINATION_COUNT_CACHE_SECONDS, total)
+        while len(self._count_cache) > settings.PAGINATION_COUNT_CACHE_SIZE:
+            self._count_cache.popitem(last=False)
+
+        return total
+
+    def paginate(
+        self,
+        query: Optional[dict] = None,
+        sort: Optional[list[tuple[str, int]]] = None,
+        page: int = 1,
+        per_page: int = 25,
+        projection: Optional[dict] = None,
+        approximate_count: bool = False
+    ) -> PaginatedQuerySet[BaseFlaskModel]:
         """
-        documents = self.model.collection.find()
-        data      = [self.model(**document) for document in documents]
+        Fetch a single page of documents with `skip`/`limit`, so only the page
+        is read and sent back, and count the matches on the server
+        separately. With `approximate_count` the total comes from
+        `cached_count` instead.
+        """
+        query  = query or {}
+        cursor = self.model.collection.find(query, projection)
+
+        if sort:
+            cursor = cursor.sort(sort)
 
-        return QuerySet(data)
+        documents = list(cursor.skip((page - 1) * per_page).limit(per_page))
+        total     = self.cached_count(query) if approximate_count else self.count(query)
+
+        data = [self.model.from_document(document, partial=bool(projection)) for document in documents]
+
+        return PaginatedQuerySet.from_page(items=data, total=total, page=page, per_page=per_page)
 
 # endregion
 
@@ -202,15 +688,18 @@ class ElasticsearchQuerySet(Generic[T]):
         return [item for item in self.items if all(getattr(item, field) == value for field, value in kwargs.items())]
 
     def paginate(self, page: int, per_page: int) -> PaginatedElasticsearchQuerySet[T]:
+        """
+        Slice already fetched hits into a page. Search results should be
+        paginated by Elasticsearch with `ElasticsearchQueryInterface.paginate`
+        instead.
+        """
         start = (page - 1) * per_page
-        end   = start + per_page
 
-        return PaginatedElasticsearchQuerySet(
-            items=self.items[start:end],
+        return PaginatedElasticsearchQuerySet.from_page(
+            items=self.items[start:start + per_page],
             total=len(self.items),
-            pages=max(len(self.items) // per_page, 1),
-            next_page=page + 1 if end < len(self.items) else None,
-            prev_page=page - 1 if start > 0 else None
+            page=page,
+            per_page=per_page
         )
 
     def delete(self) -> None:
@@ -237,20 +726,70 @@ class PaginatedElasticsearchQuerySet(ElasticsearchQuerySet):
     def __str__(self) -> str:
         return '<PaginatedElasticsearchQuerySet>'
 
+    @classmethod
+    def from_page(cls, items: list[T], total: int, page: int, per_page: int) -> 'PaginatedElasticsearchQuerySet[T]':
+        """
+        Build a paginated queryset from a single page of hits and the total
+        number of documents matching the search.
+        """
+        return cls(
+            items=items,
+            total=total,
+            pages=max(math.ceil(total / per_page), 1),
+            next_page=page + 1 if page * per_page < total else None,
+            prev_page=page - 1 if page > 1 else None
+        )
+
+    @property
+    def pagination(self) -> dict:
+        return {
+            'total': self.total,
+            'pages': self.pages,
+            'next_page': self.next_page,
+            'prev_page': self.prev_page
+        }
+
+
+@dataclass
+class CursorPaginatedElasticsearchQuerySet(PaginatedElasticsearchQuerySet):
+    """
+    Custom dataclass to represent a page of Elasticsearch hits fetched with
+    `search_after`.
+    """
+    next_cursor: Optional[str] = None
+
+    def __repr__(self) -> str:
+        if len(self.items) > 5:
+            return f'<CursorPaginatedElasticsearchQuerySet: {self.items[:5]}...>'
+        else:
+            return f'<CursorPaginatedElasticsearchQuerySet: {self.items}>'
+
+    def __str__(self) -> str:
+        return '<CursorPaginatedElasticsearchQuerySet>'
+
+    @property
+    def pagination(self) -> dict:
+        return {'next_cursor': self.next_cursor}
+
 
 class ElasticsearchQueryInterface:
+    # Analyzed subfields of the searched text fields, mapped in the index
+    # settings, so substring search never needs leading wildcards
+    search_subfields = ('ngram', 'prefix')
+    # Fields mapped as exact values (numbers or keywords) and filtered with
+    # `term` queries
+    exact_fields = ('pk', 'user_id', 'category')
+    # Relevance order for `search_after`, `_shard_doc` breaks ties within a
+    # point in time
+    seek_sort = [{'_score': {'order': 'desc'}}, {'_shard_doc': {'order': 'asc'}}]
 
     def __init__(self, model):
         # NOTE: These imports are in here to prevent potential circular
         # import issues.
         from elasticsearch import (
-            Elasticsearch,
+            BadRequestError,
             NotFoundError
         )
-        from flask import (
-            current_app,
-            g
-        )
 
         try:
             self.index_name = model.index
@@ -258,25 +797,40 @@ class ElasticsearchQueryInterface:
             raise AttributeError(f'{model.__name__} must have an `index` attribute')
 
         self.model = model
-        self.es    = getattr(
-            g,
-            '_es',
-            Elasticsearch(hosts=[current_app.config['ELASTICSEARCH_URL']])
-        )
-        self.not_found_error = NotFoundError
+        self.not_found_error   = NotFoundError
+        self.bad_request_error = BadRequestError
 
     def __repr__(self) -> str:
         return f'<ElasticsearchQueryInterface for {self.model.__name__}>'
 
+    @property
+    def es(self) -> Elasticsearch:
+        """
+        The model's Elasticsearch client, resolved on every call so the
+        process-wide client of the service is always used.
+        """
+        return self.model.es
+
+    def _filter_clauses(self, **kwargs) -> list[dict]:
+        """
+        Non-scoring clauses matching documents on exact field values. Filter
+        context lets Elasticsearch skip scoring and cache the matches.
+        """
+        if 'id' in kwargs:
+            kwargs['pk'] = kwargs.pop('id')
+
+        return [
+            {'term': {field: value}} if field in self.exact_fields else {'match': {field: value}}
+            for field, value in kwargs.items()
+        ]
+
     def get(self, **kwargs) -> Optional[BaseFlaskModel]:
         """
         Find a single document based on keyword arguments.
         """
-        query = {field: value for field, value in kwargs.items()}
-        if 'id' in query:
-            query['pk'] = query.pop('id')
+        es_query = {'query': {'bool': {'filter': self._filter_clauses(**kwargs)}}, 'size': 1}
 
-        response = self.es.search(index=self.model.index, body={'query': {'match': query}})
+        response = self.es.search(index=self.model.index, body=es_query)
         hits     = response['hits']['hits']
 
         if hits:
@@ -293,7 +847,7 @@ class ElasticsearchQueryInterface:
         try:
             response = self.es.get(index=self.model.index, id=id)
             return self.model(**response['_source']) if response['found'] else None
-        except self.NotFoundError:
+        except self.not_found_error:
             logger.info('Document not found in %s index', self.model.index)
             return None
 
@@ -301,62 +855,215 @@ class ElasticsearchQueryInterface:
         """
         Perform a filter operation based on keyword arguments.
         """
-        query = {k: v for k, v in kwargs.items()}
-        if 'id' in query:
-            query['pk'] = query.pop('id')
-
-        if query:
-            es_query = {'query': {'bool': {'must': [{'match': query}]}}}
-        else:
+        if not kwargs:
             return self.all()
+
+        es_query = {'query': {'bool': {'filter': self._filter_clauses(**kwargs)}}}
         response = self.es.search(index=self.model.index, body=es_query)
         hits     = response['hits']['hits']
         data     = [self.model(**hit['_source']) for hit in hits]
 
         return ElasticsearchQuerySet(data)
 
-    def search(self, query: dict) -> ElasticsearchQuerySet[BaseFlaskModel]:
+    def _search_clause(self, field: str, value: str) -> dict:
         """
-        Perform a search operation based on keyword arguments.
+        Match `value` anywhere in `field` through its analyzed subfields
+        (every gram of the value must be present), scoring whole word
+        matches higher.
         """
+        return {
+            'bool': {
+                'should': [
+                    {'match': {field: {'query': value, 'boost': 2}}},
+                    *({'match': {f'{field}.{subfield}': {'query': value, 'operator': 'and'}}} for subfield in self.search_subfields)
+                ],
+                'minimum_should_match': 1
+            }
+        }
+
+    def _search_query(self, query: dict) -> dict:
+        """
+        Build a substring search on the given fields, matching documents
+        where any of them contain their value.
+        """
+        query   = dict(query)
         user_id = query.pop('user_id', None)
 
         if not query:
             raise ValueError('Query must contain at least one search term')
 
+        bool_query = {
+            'should': [self._search_clause(k, v) for k, v in query.items()],
+            'minimum_should_match': 1
+        }
         if user_id:
-            es_query = {
-                'query': {
-                    'bool': {
-                        'must': [
-                            {'term': {'user_id': user_id}},
-                            {
-                                'bool': {
-                                    'should': [{'wildcard': {k: f'*{v}*'}} for k, v in query.items()],
-                                    'minimum_should_match': 1
-                                }
-                            }
-                        ]
-                    }
-                }
-            }
-        else:
-            es_query = {
-                'query': {
-                    'query_string': {
-                        'query': f'*{v}*',
-                        'fields': [k],
-                        'default_operator': 'OR'
-                    }
-                }
-                for k, v in query.items()
+            bool_query['filter'] = self._filter_clauses(user_id=user_id)
+
+        return {'bool': bool_query}
+
+    def _source_filter(self, source: SearchSourceEnum) -> dict:
+        """
+        The `_source` part of a search request for the given source mode.
+        """
+        if source == SearchSourceEnum.Ids:
+            return {'_source': False}
+
+        response_fields = self.model.response_fields()
+        if source == SearchSourceEnum.Fields and response_fields:
+            return {'_source': {'includes': sorted(response_fields)}}
+
+        return {}
+
+    def _hydrate(self, hits: list[dict], source: SearchSourceEnum) -> list[BaseFlaskModel]:
+        """
+        Build model instances from search hits:
+
+        - `document`: validate the whole `_source` of every hit
+        - `fields`: build partial models from the filtered `_source` without
+          running the validators again, it was indexed from a valid model
+        - `ids`: load the documents from MongoDB with a single `$in` query,
+          keeping the order of the hits
+        """
+        response_fields = self.model.response_fields()
+
+        if source == SearchSourceEnum.Ids:
+            object_ids = [ObjectId(hit['_id']) for hit in hits if ObjectId.is_valid(hit['_id'])]
+            if not object_ids:
+                return []
+
+            projection = self.model.query.build_projection(only=response_fields)
+            documents  = {
+                document['_id']: document
+                for document in self.model.collection.find({'_id': {'$in': object_ids}}, projection)
             }
+            if len(documents) < len(object_ids):
+                logger.info('%s hits are missing from the database', len(object_ids) - len(documents))
+
+            return [
+                self.model.from_document(documents[object_id], partial=bool(projection))
+                for object_id in object_ids if object_id in documents
+            ]
+
+        if source == SearchSourceEnum.Fields and response_fields:
+            return [self.model.from_document(hit['_source'], partial=True) for hit in hits]
+
+        return [self.model(**hit['_source']) for hit in hits]
+
+    def _close_point_in_time(self, pit_id: str) -> None:
+        try:
+            self.es.close_point_in_time(id=pit_id)
+        except Exception as e:
+            # It expires on its own after the keep alive anyway
+            logger.warning('Failed to close point in time: %s', e)
+
+    def search(self, query: dict, source: SearchSourceEnum = SearchSourceEnum.Document) -> ElasticsearchQuerySet[BaseFlaskModel]:
+        """
+        Perform a search operation based on keyword arguments. Only the
+        first page of hits is fetched, use `paginate` or `seek` to page
+        through the results.
+        """
+        es_query = {'query': self._search_query(query), **self._source_filter(source)}
 
         response = self.es.search(index=self.model.index, body=es_query)
-        data     = [self.model(**hit['_source']) for hit in response['hits']['hits']]
+        data     = self._hydrate(response['hits']['hits'], source=source)
 
         return ElasticsearchQuerySet(data)
 
+    def paginate(
+        self,
+        query: dict,
+        page: int = 1,
+        per_page: int = 25,
+        source: SearchSourceEnum = SearchSourceEnum.Document
+    ) -> PaginatedElasticsearchQuerySet[BaseFlaskModel]:
+        """
+        Fetch a single page of search results with `from`/`size` along with
+        the exact number of matches. Pages past `max_result_window` are
+        refused, those have to be reached with `seek`.
+        """
+        start = (page - 1) * per_page
+        if start + per_page > settings.ELASTICSEARCH_MAX_RESULT_WINDOW:
+            raise ValueError(
+                f'Only the first {settings.ELASTICSEARCH_MAX_RESULT_WINDOW} results can be paged by number, '
+                'use cursor pagination instead'
+            )
+
+        es_query = {
+            'query': self._search_query(query),
+            'from': start,
+            'size': per_page,
+            'track_total_hits': True,
+            **self._source_filter(source)
+        }
+
+        response = self.es.search(index=self.model.index, body=es_query)
+        hits     = response['hits']
+        data     = self._hydrate(hits['hits'], source=source)
+
+        return PaginatedElasticsearchQuerySet.from_page(items=data, total=hits['total']['value'], page=page, per_page=per_page)
+
+    def seek(
+        self,
+        query: dict,
+        per_page: int = 25,
+        cursor: Optional[str] = None,
+        source: SearchSourceEnum = SearchSourceEnum.Document
+    ) -> CursorPaginatedElasticsearchQuerySet[BaseFlaskModel]:
+        """
+        Deep pagination: fetch the page following `cursor` with `search_after`
+        against a point in time, so every page costs the same and stays
+        consistent while the index changes. The first page opens the point in
+        time, the last one closes it.
+        """
+        search_query = self._search_query(query)
+        query_digest = hashlib.sha256(json_util.dumps(search_query, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+        es_query = {
+            'query': search_query,
+            'size': per_page + 1,
+            'sort': self.seek_sort,
+            'track_total_hits': False,
+            **self._source_filter(source)
+        }
+
+        if cursor:
+            pit_id, values, cursor_digest = decode_search_cursor(cursor)
+            if cursor_digest != query_digest:
+                raise ValueError('Pagination cursor does not match the search query')
+
+            es_query['search_after'] = values
+        else:
+            pit_id = self.es.open_point_in_time(index=self.model.index, keep_alive=settings.ELASTICSEARCH_PIT_KEEP_ALIVE)['id']
+
+        es_query['pit'] = {'id': pit_id, 'keep_alive': settings.ELASTICSEARCH_PIT_KEEP_ALIVE}
+
+        try:
+            # NOTE: Searches against a point in time must not name the index
+            response = self.es.search(body=es_query)
+        except Exception as e:
+            if not cursor:
+                # No cursor references the point in time opened above yet, so
+                # close it rather than leave it open until the keep alive ends
+                self._close_point_in_time(pit_id)
+            elif isinstance(e, (self.not_found_error, self.bad_request_error)):
+                raise ValueError('Pagination cursor has expired or is invalid')
+
+            raise
+
+        hits        = response['hits']['hits']
+        pit_id      = response.get('pit_id', pit_id)
+        next_cursor = None
+
+        if len(hits) > per_page:
+            hits        = hits[:per_page]
+            next_cursor = encode_search_cursor(pit_id=pit_id, values=hits[-1]['sort'], query_digest=query_digest)
+        else:
+            self._close_point_in_time(pit_id)
+
+        data = self._hydrate(hits, source=source)
+
+        return CursorPaginatedElasticsearchQuerySet(items=data, next_cursor=next_cursor)
+
     def all(self) -> ElasticsearchQuerySet[BaseFlaskModel]:
         """
         Find all items in an index and return them as instances of their
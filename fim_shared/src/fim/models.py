@@ -4,7 +4,12 @@ import datetime
 from abc import abstractmethod
 from typing import (
     TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
     Optional,
+    Set,
+    Tuple,
     Type
 )
 
@@ -18,16 +23,36 @@ from fim.interface import (
     T
 )
 from flask_pymongo.wrappers import Collection
+from pydantic import PrivateAttr
 from pymongo import errors
 
 logger = settings.getLogger(__name__)
 
 
 if TYPE_CHECKING:
+    from elasticsearch import Elasticsearch
     from flask_pymongo import PyMongo
 
 
+_MISSING = object()
+
+
 class BaseFlaskModel(schemas.BaseModelSchema):
+    # Fields that were not loaded because of a query projection
+    _deferred_fields: Set[str] = PrivateAttr(default_factory=set)
+    # Fields assigned a new value since the instance was loaded or saved
+    _changed_fields: Set[str] = PrivateAttr(default_factory=set)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name not in self.model_fields:
+            return super().__setattr__(name, value)
+
+        previous = self.__dict__.get(name, _MISSING)
+        super().__setattr__(name, value)
+
+        # Compare the validated values so no-op assignments stay clean
+        if name in self._deferred_fields or self.__dict__.get(name, _MISSING) != previous:
+            self._changed_fields.add(name)
 
     @property
     @abstractmethod
@@ -45,6 +70,14 @@ class BaseFlaskModel(schemas.BaseModelSchema):
         """
         raise NotImplementedError('Calling from the base class')
 
+    @classmethod
+    @property
+    def es(cls) -> Elasticsearch:
+        """
+        Define the Elasticsearch client for the model.
+        """
+        raise NotImplementedError('This service does not utilize Elasticsearch')
+
     @classmethod
     @property
     def index(cls) -> str:
@@ -81,6 +114,48 @@ class BaseFlaskModel(schemas.BaseModelSchema):
 
         return cls._es_query_interface
 
+    @classmethod
+    def response_fields(cls) -> Optional[Set[str]]:
+        """
+        Document fields needed to build the model's API response. Queries
+        made by the APIs are projected to these fields. `None` loads the
+        whole document.
+        """
+        return None
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any], partial: bool = False):
+        """
+        Build a model instance from a MongoDB document. A `partial` document
+        comes from a projected query and skips validation, since required
+        fields may be missing. Those fields are tracked as deferred.
+        """
+        if not partial:
+            return cls(**document)
+
+        obj = cls.model_construct(**document)
+        obj._deferred_fields = {
+            name for name, field in cls.model_fields.items()
+            if (field.alias or name) not in document and name not in document
+        }
+
+        return obj
+
+    @property
+    def deferred_fields(self) -> Set[str]:
+        return self._deferred_fields
+
+    @property
+    def changed_fields(self) -> Set[str]:
+        return set(self._changed_fields)
+
+    def mark_changed(self, *fields: str) -> None:
+        """
+        Flag fields as changed when they were mutated in place (e.g. an
+        attribute of an embedded model), which assignment tracking can't see.
+        """
+        self._changed_fields.update(fields)
+
     @classmethod
     def __next_pk(cls) -> int:
         """
@@ -95,6 +170,21 @@ class BaseFlaskModel(schemas.BaseModelSchema):
         )
         return pk_document['seq']
 
+    @classmethod
+    def __reserve_pks(cls, count: int) -> range:
+        """
+        Reserve a contiguous block of `count` pk numbers for a given collection
+        with a single counter update.
+        """
+        pk_document = cls.db.counters.find_one_and_update(
+            {'_id': cls.collection.name},
+            {'$inc': {'seq': count}},
+            upsert=True,
+            return_document=True,
+            new=True
+        )
+        return range(pk_document['seq'] - count + 1, pk_document['seq'] + 1)
+
     @classmethod
     def __rollback_pk(cls) -> None:
         """
@@ -107,10 +197,11 @@ class BaseFlaskModel(schemas.BaseModelSchema):
         )
 
     @classmethod
-    def create(cls, **kwargs):
+    def create(cls, refresh: bool = False, **kwargs):
         """
         Create a new document in the collection and return it as an instance of
-        its corresponding model.
+        its corresponding model. The in-memory instance is returned as is
+        unless `refresh` is set, in which case it is re-read from the database.
         """
         obj    = cls(**kwargs)
         obj.pk = cls.__next_pk()
@@ -126,12 +217,66 @@ class BaseFlaskModel(schemas.BaseModelSchema):
         if not result.acknowledged:
             raise Exception(f'Failed to create {cls.__name__} document')
 
+        obj.id = result.inserted_id
+        obj._changed_fields.clear()
+
+        if not refresh:
+            return obj
+
         new_obj = cls.query.find_by_id(result.inserted_id)
         if not new_obj:
             raise Exception(f'Failed to find newly created {cls.__name__} document')
 
         return new_obj
 
+    @classmethod
+    def bulk_create(cls, items: List[Dict[str, Any]]) -> Tuple[List['BaseFlaskModel'], List[Dict[str, Any]]]:
+        """
+        Create many documents with a single unordered `insert_many`, reserving
+        their pk numbers in one counter update. Returns the created instances
+        and the per-item write failures (e.g. duplicate keys), which reference
+        the position of the item in `items`.
+        """
+        if not items:
+            return [], []
+
+        objs = [cls(**data) for data in items]
+        for obj, pk in zip(objs, cls.__reserve_pks(len(objs))):
+            obj.pk = pk
+
+        documents = [obj.model_dump(override=False) for obj in objs]
+        failures  = []
+
+        try:
+            result = cls.collection.insert_many(documents, ordered=False)
+            if not result.acknowledged:
+                raise Exception(f'Failed to create {cls.__name__} documents')
+
+        except errors.BulkWriteError as e:
+            for write_error in e.details.get('writeErrors', []):
+                logger.error('Bulk insert error on item %s: %s', write_error['index'], write_error['errmsg'])
+
+                failures.append({
+                    'index': write_error['index'],
+                    'code': write_error['code'],
+                    'key': write_error.get('keyValue'),
+                    'message': 'duplicate key' if write_error['code'] == 11000 else write_error['errmsg']
+                })
+
+        failed = {failure['index'] for failure in failures}
+        new_objs = []
+
+        for position, (obj, document) in enumerate(zip(objs, documents)):
+            if position in failed:
+                continue
+
+            # insert_many sets the generated ObjectId on each document
+            obj.id = document['_id']
+            obj._changed_fields.clear()
+            new_objs.append(obj)
+
+        return new_objs, failures
+
     def delete(self) -> None:
         """
         Delete a document from the collection.
@@ -155,9 +300,17 @@ class BaseFlaskModel(schemas.BaseModelSchema):
         """
         raise NotImplementedError('Method not implemented')
 
-    def update_index(self, index: str) -> None:
+    @classmethod
+    def add_many_to_index(cls, index: str, objs: List['BaseFlaskModel']) -> None:
+        """
+        Add many documents to the search index at once.
+        """
+        raise NotImplementedError('Method not implemented')
+
+    def update_index(self, index: str, fields: Optional[Set[str]] = None) -> None:
         """
-        Update a document in the search index.
+        Update a document in the search index, optionally limited to the
+        given fields.
         """
         raise NotImplementedError('Method not implemented')
 
@@ -167,17 +320,34 @@ class BaseFlaskModel(schemas.BaseModelSchema):
         """
         raise NotImplementedError('Method not implemented')
 
-    def save(self):
+    @classmethod
+    def remove_many_from_index(cls, index: str, ids: List[schemas.FIMObjectID]) -> None:
+        """
+        Remove many documents from the search index at once.
+        """
+        raise NotImplementedError('Method not implemented')
+
+    def save(self) -> Set[str]:
         """
-        Save the current instance to the database.
+        Save the changed fields of the current instance to the database with a
+        minimal `$set`, skipping the write when nothing changed. Returns the
+        saved fields.
         """
+        if not self._changed_fields:
+            logger.debug('[%s:%s] No changes to save', self.__class__.__name__, self.id)
+            return set()
+
         self.updated_at = datetime.datetime.utcnow()
 
-        document = self.model_dump(override=False)
-        self.collection.update_one(
-            {'_id': self.id},
-            {'$set': document}
-        )
+        changed  = set(self._changed_fields)
+        document = self.model_dump(override=False, include=changed)
+
+        # NOTE: None values are stored as null, not unset, so fields with a
+        # default don't come back as their default on the next load
+        self.collection.update_one({'_id': self.id}, {'$set': document})
+        self._changed_fields.clear()
+
+        return changed
 
 
 class BasePKFlaskModel(schemas.BasePKModelSchema, BaseFlaskModel):
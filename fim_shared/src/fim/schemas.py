@@ -9,10 +9,15 @@ from typing import (
 )
 
 from bson import ObjectId
-from fim.constants import SortDirectionEnum
+from fim.constants import (
+    PaginationModeEnum,
+    SortDirectionEnum
+)
 from pydantic import (
     BaseModel,
     Field,
+    ValidationInfo,
+    field_validator,
     validator
 )
 
@@ -55,6 +60,17 @@ class BaseModelSchema(BaseModel):
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     updated_at: Optional[datetime.datetime] = None
 
+    @validator('created_at', 'updated_at', always=True)
+    def validate_datetime_precision(cls, value):
+        """
+        Validator to truncate datetimes to the millisecond precision of BSON
+        dates, so in-memory instances match their stored documents
+        """
+        if value:
+            return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+        return value
+
     def model_dump(self, override: bool = False, **kwargs):
         return super().model_dump(**kwargs)
 
@@ -101,10 +117,11 @@ class BasePaginationSchema(BaseModel):
 
 
 class BasePaginationResponseSchema(BaseModel):
-    total: int
-    pages: int
-    next_page: Optional[int]
-    prev_page: Optional[int]
+    total: Optional[int] = None
+    pages: Optional[int] = None
+    next_page: Optional[int] = None
+    prev_page: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class BaseCreateResponseSchema(BaseSuccessResponseSchema):
@@ -115,17 +132,28 @@ class BaseCreateResponseSchema(BaseSuccessResponseSchema):
 class BaseBulkCreateResponseSchema(BaseSuccessResponseSchema):
     status: int = HTTPStatus.CREATED
     data: List[Dict] = list(dict())
+    errors: List[Dict] = list()
 
 
 class BaseSearchQuerySchema(BasePaginationSchema):
-    ...
+    pagination_mode: PaginationModeEnum = PaginationModeEnum.Offset
+    cursor: Optional[str] = Field(None, description='Opaque `next_cursor` value from the previous page')
 
-    @validator('*', pre=True)
-    def force_lowercase(cls, v):
-        if isinstance(v, str):
+    @field_validator('*', mode='before')
+    @classmethod
+    def force_lowercase(cls, v, info: ValidationInfo):
+        # NOTE: Cursors are case sensitive tokens
+        if isinstance(v, str) and info.field_name != 'cursor':
             return v.lower()
         return v
 
+    @validator('pagination_mode', always=True)
+    def validate_pagination_mode(cls, value):
+        """
+        Validator to pull the value from the enum choice
+        """
+        return value.value
+
 
 class BaseSearchResponseSchema(BaseSuccessResponseSchema):
     ...
@@ -136,6 +164,9 @@ class BaseListQuerySchema(BasePaginationSchema):
     order_by: Optional[str] = ''
     id_in: Optional[Union[List[int], str]] = list()
 
+    pagination_mode: PaginationModeEnum = PaginationModeEnum.Offset
+    cursor: Optional[str] = Field(None, description='Opaque `next_cursor` value from the previous page')
+
     @validator('direction', always=True)
     def validate_direction(cls, value):
         """
@@ -143,6 +174,13 @@ class BaseListQuerySchema(BasePaginationSchema):
         """
         return value.value
 
+    @validator('pagination_mode', always=True)
+    def validate_pagination_mode(cls, value):
+        """
+        Validator to pull the value from the enum choice
+        """
+        return value.value
+
     @validator('id_in', always=True)
     def validate_id_in(cls, value):
         """
@@ -186,6 +224,7 @@ class BaseBulkDeleteRequestSchema(BaseModel):
 
 class BaseBulkDeleteResponseSchema(BaseSuccessResponseSchema):
     status: int = HTTPStatus.RESET_CONTENT
+    deleted: int = 0
 
 
 class BaseDeleteResponseSchema(BaseSuccessResponseSchema):
@@ -214,4 +253,9 @@ class InternalServerErrorResponseSchema(BaseErrorResponseSchema):
     message: str = 'internal server error'
     status: int = HTTPStatus.INTERNAL_SERVER_ERROR
 
+
+class ServiceUnavailableResponseSchema(BaseErrorResponseSchema):
+    message: str = 'service unavailable'
+    status: int = HTTPStatus.SERVICE_UNAVAILABLE
+
 # endregion
@@ -12,6 +12,21 @@ LOG_STREAM_HANDLER.setFormatter(LOG_STREAM_FORMATTER)
 PROPAGATE_LOGS = False
 
 
+# Pagination settings
+PAGINATION_COUNT_CACHE_SECONDS = 60
+PAGINATION_COUNT_CACHE_SIZE    = 1_024
+
+# Elasticsearch refuses from/size requests past `index.max_result_window`,
+# deeper pages are fetched with `search_after` against a point in time
+ELASTICSEARCH_MAX_RESULT_WINDOW = 10_000
+ELASTICSEARCH_PIT_KEEP_ALIVE    = '2m'
+
+
+# Authentication settings
+# Redis prefix of the revoked token markers shared by all services
+REVOKED_TOKEN_CACHE_PREFIX = 'fim:revoked-token'
+
+
 def getLogger(name: str = None):
     """
     Custom method to retrieve a logger instance with a given name
@@ -1,43 +1,63 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
 from flask import (
-    current_app,
-    g
+    Flask,
+    current_app
 )
 from flask_pymongo import PyMongo
 from iam import settings
-from redis import Redis
+from redis import (
+    ConnectionPool,
+    Redis
+)
+from redis.client import Pipeline
 from werkzeug.local import LocalProxy
 
 logger = settings.getLogger(__name__)
 
+# Process-wide MongoClient (and connection pool), initialized in `create_app`
+mongo      = PyMongo()
+mongo_lock = threading.Lock()
 
-def get_db():
+# Process-wide Redis connection pool. Connections are opened lazily and the
+# pool resets itself after a fork, so it is safe to create at import time.
+redis_pool = ConnectionPool(**settings.REDIS_POOL_OPTIONS)
+redis_conn = Redis(connection_pool=redis_pool)
+
+
+def init_db(app: Flask) -> PyMongo:
     """
-    Configuration method to return db instance
+    Configuration method to create the shared MongoClient for the process
     """
-    db = getattr(g, "_database", None)
+    with mongo_lock:
+        if mongo.cx is None:
+            mongo.init_app(app, **settings.MONGO_CLIENT_OPTIONS)
 
-    if db is None:
-        db = g._database = PyMongo(current_app).db
+    return mongo
 
-    return db
 
-
-def get_redis_conn():
+def get_db():
     """
-    Configuration method to return Redis instance
+    Configuration method to return db instance
     """
-    redis_conn = getattr(g, '_redis_conn', None)
+    if mongo.db is None:
+        init_db(current_app)
 
-    if redis_conn is None:
-        redis_conn = g._redis = Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=settings.REDIS_DB,
-            decode_responses=True
-        )
+    return mongo.db
 
-    return redis_conn
+
+@contextmanager
+def redis_pipeline(transaction: bool = False) -> Iterator[Pipeline]:
+    """
+    Batch several Redis commands into a single round trip on the shared
+    pool. The commands are executed when the block exits cleanly.
+    """
+    with redis_conn.pipeline(transaction=transaction) as pipe:
+        yield pipe
+        pipe.execute()
 
 
 db    = LocalProxy(get_db)
-cache = LocalProxy(get_redis_conn)
+cache = redis_conn
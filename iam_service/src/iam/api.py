@@ -1,4 +1,8 @@
 from http import HTTPStatus
+from typing import (
+    Dict,
+    Tuple
+)
 
 from fim.api import (
     BaseBulkDeleteAPI,
@@ -6,14 +10,22 @@ from fim.api import (
     BaseListAPI
 )
 from fim.authentication import (
+    hash_token,
     protected_view,
     superuser_view
 )
 from fim.schemas import (
     BadRequestResponseSchema,
     NotFoundResponseSchema,
+    ServiceUnavailableResponseSchema,
     UnauthorizedResponseSchema
 )
+from fim.tokens import (
+    ExpiredTokenError,
+    InvalidTokenError,
+    is_signed_token,
+    verify_token
+)
 from flask import (
     jsonify,
     session
@@ -24,8 +36,12 @@ from iam import (
     settings
 )
 from iam.authentication import IAMTokenAuthentication
+from iam.passwords import PasswordHasherBusy
 from iam.schemas import (
     ExternalAuthenticationResponseSchema,
+    ExternalBatchAuthenticationRequestSchema,
+    ExternalBatchAuthenticationResponseSchema,
+    ExternalBatchAuthenticationResultSchema,
     LoginRequestSchema,
     LoginResponseSchema,
     SignupRequestSchema,
@@ -62,7 +78,8 @@ class SignupAPI:
         description='This endpoint is used to create a new user account.',
         responses={
             HTTPStatus.CREATED: SignupResponseSchema,
-            HTTPStatus.BAD_REQUEST: BadRequestResponseSchema
+            HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=None
     )
@@ -73,6 +90,8 @@ class SignupAPI:
         try:
             models.User.create(**new_user_data)
             return jsonify(SignupResponseSchema(message='new user created successfully').dict()), HTTPStatus.CREATED
+        except PasswordHasherBusy as e:
+            return jsonify(ServiceUnavailableResponseSchema(message=str(e)).dict()), HTTPStatus.SERVICE_UNAVAILABLE
         except Exception:
             logger.exception('Error creating new user: %s', new_user_data['email'])
             return jsonify(BadRequestResponseSchema(message='error creating new user').dict()), HTTPStatus.BAD_REQUEST
@@ -92,7 +111,8 @@ class LoginAPI:
         responses={
             HTTPStatus.OK: LoginResponseSchema,
             HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
-            HTTPStatus.NOT_FOUND: NotFoundResponseSchema
+            HTTPStatus.NOT_FOUND: NotFoundResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=None
     )
@@ -101,8 +121,13 @@ class LoginAPI:
         if not user:
             return jsonify(NotFoundResponseSchema(message='user not found').dict()), HTTPStatus.NOT_FOUND
 
-        if not user.verify_password(body.password):
-            return jsonify(BadRequestResponseSchema(message='invalid password').dict()), HTTPStatus.BAD_REQUEST
+        try:
+            if not user.verify_password(body.password):
+                return jsonify(BadRequestResponseSchema(message='invalid password').dict()), HTTPStatus.BAD_REQUEST
+
+            user.rehash_password(body.password)
+        except PasswordHasherBusy as e:
+            return jsonify(ServiceUnavailableResponseSchema(message=str(e)).dict()), HTTPStatus.SERVICE_UNAVAILABLE
 
         token              = login_user(user)
         session['user_id'] = str(user.id)
@@ -230,6 +255,11 @@ class UserBulkDeleteAPI(BaseBulkDeleteAPI):
     )
     @superuser_view
     def delete(self, body: request_body_schema):
+        # NOTE: Projected documents aren't validated, so `auth_token` is the raw
+        # embedded document here
+        users = self.__class__.model.query.filter(id=body.ids, only=['auth_token.key_hash'])
+        models.IAMAuthToken.revoke_many(user.auth_token['key_hash'] for user in users if user.auth_token)
+
         return super().delete(body)
 
 # endregion
@@ -244,21 +274,80 @@ class ExternalAuthenticationAPI:
 
     response_schema = ExternalAuthenticationResponseSchema
 
-    def post(self):
-        auth_response = self.authentication_class()
-        if not auth_response.authenticated:
-            return auth_response.response
-
-        user_obj        = auth_response.user
+    @staticmethod
+    def _serialize(user_obj: models.User, token_obj: models.IAMAuthToken) -> Tuple[Dict, Dict]:
+        """
+        Prepare the user and token data returned to the calling service
+        """
         user_data       = user_obj.model_dump()
         # NOTE: Force the MongoDB ObjectID into the response so the calling service
         # can use it for document referencing
         user_data['id'] = str(user_obj.id)
 
-        token_obj  = auth_response.token
-        token_data = token_obj.model_dump()
+        token_data               = token_obj.model_dump()
+        token_data['expires_in'] = token_obj.expires_in
+
+        return user_data, token_data
+
+    def post(self):
+        auth_response = self.authentication_class.for_request()
+        if not auth_response.authenticated:
+            return auth_response.response
+
+        user_data, token_data = self._serialize(auth_response.user, auth_response.token)
 
         response_body = self.response_schema(user=user_data, token=token_data)
         return jsonify(response_body.dict()), HTTPStatus.OK
 
+
+@service_api_v1.route('/authenticate/batch')
+class ExternalBatchAuthenticationAPI(ExternalAuthenticationAPI):
+    """
+    Validate many tokens at once, with a single indexed `$in` query
+    """
+    response_schema = ExternalBatchAuthenticationResponseSchema
+
+    def post(self, body: ExternalBatchAuthenticationRequestSchema):
+        results       = {}
+        lookup_hashes = []
+
+        for token_key in body.tokens:
+            token_hash = hash_token(token_key)
+            if token_hash in results:
+                continue
+
+            result = results[token_hash] = ExternalBatchAuthenticationResultSchema(token_hash=token_hash, message='invalid token')
+
+            if is_signed_token(token_key):
+                try:
+                    verify_token(token_key, keys=settings.AUTH_SIGNING_KEYS)
+                except InvalidTokenError as e:
+                    if isinstance(e, ExpiredTokenError):
+                        result.message = 'expired token'
+                    continue
+
+            lookup_hashes.append(token_hash)
+
+        users     = models.User.query.filter(**{'auth_token.key_hash': lookup_hashes}) if lookup_hashes else []
+        refreshes = []
+
+        for user in users:
+            result = results[user.auth_token.key_hash]
+
+            token = user.token
+            if not token or not token.is_valid:
+                result.message = 'expired token'
+                continue
+
+            refreshes.append(token)
+
+            result.user, result.token = self._serialize(user, token)
+            result.authenticated      = True
+            result.message            = None
+
+        models.IAMAuthToken.refresh_many(refreshes)
+
+        response_body = self.response_schema(results=list(results.values()))
+        return jsonify(response_body.dict()), HTTPStatus.OK
+
 # endregion
@@ -1,6 +1,11 @@
+import os
+
 from flask_cors import CORS
 from flask_openapi3 import OpenAPI
-from iam import settings
+from iam import (
+    init_db,
+    settings
+)
 
 cors = CORS()
 
@@ -9,6 +14,7 @@ def create_app():
     app = OpenAPI(__name__, **settings.OPENAPI_APP_CONFIG)
     app.config.from_object(settings.FlaskConfig)
     cors.init_app(app, resources=settings.CORS_RESOURCES)
+    init_db(app)
 
     with app.app_context():
         from iam import utils
@@ -18,9 +24,50 @@ def create_app():
 
         utils.setup_database_indexes()
 
+    register_commands(app)
+
     return app
 
 
+def register_commands(app: OpenAPI):
+    @app.cli.command('index-advisor')
+    def index_advisor():
+        """
+        Explain the API query shapes and fail if any of them scans the whole collection.
+        """
+        from iam import utils
+
+        flagged = utils.advise_indexes()
+        if any(report.collscan for report in flagged):
+            raise SystemExit(1)
+
+    @app.cli.command('flush-token-refreshes')
+    def flush_token_refreshes():
+        """
+        Write the buffered user auth token refreshes to the database.
+        """
+        from iam import utils
+
+        utils.flush_token_refreshes()
+
+
+def start_background_tasks(app: OpenAPI):
+    """
+    Start the background threads of the serving process. Kept out of
+    `create_app` so CLI commands and shells don't run them.
+    """
+    # NOTE: With the reloader, only the child process serves requests
+    if app.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return
+
+    if settings.TOKEN_REFRESH_FLUSHER_ENABLED:
+        from iam import utils
+
+        utils.start_token_refresh_flusher()
+
+
 if __name__ == '__main__':
     app = create_app()
+    start_background_tasks(app)
+
     app.run(host=settings.HOST)
@@ -3,13 +3,25 @@ from http import HTTPStatus
 from typing import Optional
 
 from fim import schemas as base_schemas
-from fim.authentication import BaseAuthentication
+from fim.authentication import (
+    BaseAuthentication,
+    hash_token
+)
+from fim.tokens import (
+    ExpiredTokenError,
+    InvalidTokenError,
+    is_signed_token,
+    verify_token
+)
 from flask import (
     g,
     jsonify,
     request
 )
-from iam import models
+from iam import (
+    models,
+    settings
+)
 
 
 @dataclass
@@ -17,9 +29,6 @@ class IAMTokenAuthentication(BaseAuthentication):
     user: Optional[models.User]          = None
     token: Optional[models.IAMAuthToken] = None
 
-    def __init__(self):
-        self.__class__.validate_request()
-
     @classmethod
     def _extract_request_token(cls) -> Optional[str]:
         auth_header = request.headers.get('Authorization', '')
@@ -28,32 +37,43 @@ class IAMTokenAuthentication(BaseAuthentication):
 
         return None
 
-    @classmethod
-    def validate_request(cls) -> None:
-        token_key = cls._extract_request_token()
+    def validate_request(self) -> None:
+        token_key = self._extract_request_token()
         if not token_key:
             response_body = base_schemas.UnauthorizedResponseSchema(message='missing authorization header').dict()
 
-            cls.authenticated = False
-            cls.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
+            self.authenticated = False
+            self.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
             return
 
-        cls.user = models.User.query.filter(**{'auth_token.key': token_key}).first()
-        if not cls.user:
+        if is_signed_token(token_key):
+            try:
+                verify_token(token_key, keys=settings.AUTH_SIGNING_KEYS)
+            except InvalidTokenError as e:
+                message       = 'expired token' if isinstance(e, ExpiredTokenError) else 'invalid token'
+                response_body = base_schemas.UnauthorizedResponseSchema(message=message).dict()
+
+                self.authenticated = False
+                self.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
+                return
+
+        self.user = models.User.query.filter(**{'auth_token.key_hash': hash_token(token_key)}).first()
+        if not self.user:
             response_body = base_schemas.UnauthorizedResponseSchema(message='invalid token').dict()
 
-            cls.authenticated = False
-            cls.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
+            self.authenticated = False
+            self.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
             return
 
-        if cls.user:
-            if not cls.user.token or not cls.user.token.is_valid:
-                response_body = base_schemas.UnauthorizedResponseSchema(message='expired token').dict()
+        if not self.user.token or not self.user.token.is_valid:
+            response_body = base_schemas.UnauthorizedResponseSchema(message='expired token').dict()
 
-                cls.authenticated = False
-                cls.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
-                return
+            self.authenticated = False
+            self.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
+            return
+
+        self.user.refresh_token()
 
-            cls.token         = cls.user.token
-            g.user            = cls.user
-            cls.authenticated = True
+        self.token         = self.user.token
+        self.authenticated = True
+        g.user             = self.user
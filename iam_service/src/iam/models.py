@@ -1,18 +1,22 @@
 from __future__ import annotations
 
 import datetime
+import time
 from typing import (
     TYPE_CHECKING,
+    Iterable,
     Optional
 )
 
-import bcrypt
+from fim.authentication import revoked_token_cache_key
 from flask_pymongo.wrappers import Collection
 from iam import (
+    passwords,
     schemas,
     settings
 )
 from iam.interface import UserQueryInterface
+from redis import RedisError
 
 logger = settings.getLogger(__name__)
 
@@ -35,11 +39,15 @@ class IAMAuthToken(schemas.AuthTokenModel):
     def is_valid(self) -> bool:
         logger.info('Validating user auth token')
 
-        if self.expired:
-            return False
+        return not self.expired
 
-        self.refresh()
-        return True
+    @property
+    def needs_refresh(self) -> bool:
+        """
+        Whether the stored `updated_at` is old enough to be refreshed
+        """
+        token_age = datetime.datetime.utcnow() - self.updated_at
+        return token_age.total_seconds() >= settings.TOKEN_REFRESH_INTERVAL_SECONDS
 
     def refresh(self) -> None:
         """
@@ -48,6 +56,62 @@ class IAMAuthToken(schemas.AuthTokenModel):
         """
         self.updated_at = datetime.datetime.utcnow()
 
+    @property
+    def expires_in(self) -> int:
+        """
+        Seconds left before the token expires
+        """
+        token_age = datetime.datetime.utcnow() - self.updated_at
+        return max(int(settings.MAX_TOKEN_AGE_SECONDS - token_age.total_seconds()), 0)
+
+    @classmethod
+    def revoke_many(cls, key_hashes: Iterable[str]) -> None:
+        """
+        Mark tokens as revoked so other services drop their cached
+        validations of them.
+        """
+        from iam import redis_pipeline
+
+        try:
+            with redis_pipeline() as pipe:
+                for key_hash in key_hashes:
+                    pipe.set(revoked_token_cache_key(key_hash), 1, ex=settings.MAX_TOKEN_AGE_SECONDS)
+        except RedisError:
+            logger.exception('Error revoking user auth tokens')
+
+    @classmethod
+    def refresh_many(cls, tokens: Iterable[IAMAuthToken]) -> None:
+        """
+        Buffer the sliding expiry refresh of many tokens in two Redis round
+        trips: one to take the per-token throttle locks, one to buffer the
+        tokens whose lock was free.
+        """
+        from iam import (
+            redis_conn,
+            redis_pipeline
+        )
+
+        key_hashes = list(dict.fromkeys(token.key_hash for token in tokens if token.is_valid and token.needs_refresh))
+        if not key_hashes:
+            return
+
+        try:
+            with redis_conn.pipeline(transaction=False) as pipe:
+                for key_hash in key_hashes:
+                    pipe.set(f'{settings.TOKEN_REFRESH_LOCK_KEY}:{key_hash}', 1, nx=True, ex=settings.TOKEN_REFRESH_INTERVAL_SECONDS)
+
+                acquired = pipe.execute()
+
+            refreshed_at = time.time()
+            refreshes    = {key_hash: refreshed_at for key_hash, locked in zip(key_hashes, acquired) if locked}
+            if refreshes:
+                logger.info('Refreshing %s user auth tokens.', len(refreshes))
+
+                with redis_pipeline() as pipe:
+                    pipe.hset(settings.TOKEN_REFRESH_BUFFER_KEY, mapping=refreshes)
+        except RedisError:
+            logger.exception('Error buffering user auth token refreshes')
+
     def delete(self) -> None:
         raise AttributeError('Cannot directly delete an IAMAuthToken instance.')
 
@@ -105,21 +169,20 @@ class User(schemas.UserModel):
     @token.deleter
     def token(self) -> None:
         if self.auth_token:
+            IAMAuthToken.revoke_many([self.auth_token.key_hash])
+
             self.auth_token = None
             self.save()
 
     def refresh_token(self) -> None:
         """
         Refresh an AuthToken's updated_at value to prevent it from becoming
-        stale/expired
+        stale/expired. Refreshes are throttled to one per
+        `TOKEN_REFRESH_INTERVAL_SECONDS` and buffered in Redis, to be written
+        in batches by `utils.flush_token_refreshes`.
         """
-        logger.info('Refreshing user auth token.')
-
-        if not self.token or not self.token.is_valid():
-            return
-
-        self.token.refresh()
-        self.save()
+        if token := self.token:
+            IAMAuthToken.refresh_many([token])
 
     def delete_token(self) -> None:
         logger.info('Removing user auth token.')
@@ -127,8 +190,30 @@ class User(schemas.UserModel):
         del self.token
         self.save()
 
-    def verify_password(self, password: str) -> str:
-        return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
+    def delete(self) -> None:
+        if self.auth_token:
+            IAMAuthToken.revoke_many([self.auth_token.key_hash])
+
+        super().delete()
+
+    def verify_password(self, password: str) -> bool:
+        return passwords.verify_password(password, self.password)
+
+    def rehash_password(self, password: str) -> None:
+        """
+        Re-hash a verified password when its hash was made with an outdated
+        bcrypt cost.
+        """
+        if not passwords.needs_rehash(self.password):
+            return
+
+        logger.info('[%s] Rehashing user password', self.email)
+
+        # NOTE: `password` is frozen on the model, so the new hash bypasses
+        # assignment and is flagged for `save()` by hand
+        self.__dict__['password'] = passwords.hash_password(password)
+        self.mark_changed('password')
+        self.save()
 
     def __repr__(self):
         return f'<{self.__class__.__name__}: {self.email} ({self.pk})>'
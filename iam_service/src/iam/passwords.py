@@ -0,0 +1,102 @@
+"""
+Password hashing and verification.
+
+bcrypt is deliberately slow, so it runs in a small process pool instead of
+the request threads. The number of hashes queued or running is bounded;
+once the pool is saturated new work is rejected right away with
+`PasswordHasherBusy` (a 503 for the caller) rather than queueing up behind
+a login burst and starving every worker.
+"""
+import multiprocessing
+import re
+import threading
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor
+)
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import (
+    Any,
+    Callable,
+    Optional
+)
+
+import bcrypt
+from iam import settings
+
+logger = settings.getLogger(__name__)
+
+PASSWORD_HASH_REGEX = re.compile(r'^\$2[abxy]\$(?P<rounds>\d{2})\$[./0-9A-Za-z]{53}$')
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending_slots = threading.BoundedSemaphore(settings.PASSWORD_POOL_MAX_PENDING)
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the password pool is saturated or too slow to answer
+    """
+
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # NOTE: `spawn` so the workers don't inherit the locks and
+                # connection pools of a threaded web process
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+
+    return _executor
+
+
+def _run(fn: Callable, *args) -> Any:
+    if not _pending_slots.acquire(blocking=False):
+        raise PasswordHasherBusy('password hashing is saturated')
+
+    try:
+        future: Future = _get_executor().submit(fn, *args)
+    except Exception:
+        _pending_slots.release()
+        raise
+
+    future.add_done_callback(lambda _: _pending_slots.release())
+
+    try:
+        return future.result(timeout=settings.PASSWORD_POOL_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        logger.warning('Password hashing timed out after %s seconds', settings.PASSWORD_POOL_TIMEOUT_SECONDS)
+        raise PasswordHasherBusy('password hashing timed out')
+
+
+def is_password_hash(value: str) -> bool:
+    return bool(PASSWORD_HASH_REGEX.match(value))
+
+
+def hash_password(password: str) -> str:
+    return _run(_hashpw, password.encode('utf-8'), settings.BCRYPT_ROUNDS).decode('utf-8')
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return _run(_checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def needs_rehash(hashed: str) -> bool:
+    """
+    Whether a hash was made with a different cost than `BCRYPT_ROUNDS`
+    """
+    match = PASSWORD_HASH_REGEX.match(hashed)
+    return bool(match) and int(match.group('rounds')) != settings.BCRYPT_ROUNDS
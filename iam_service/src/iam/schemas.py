@@ -1,17 +1,21 @@
 import datetime
-import os
-import re
+import secrets
 from typing import (
     Any,
     Dict,
-    Optional
+    List,
+    Optional,
+    Set
 )
 
-import bcrypt
 from fim import models as base_models
 from fim import schemas as base_schemas
+from fim.authentication import hash_token
 from iam import constants as iam_constants
-from iam import settings
+from iam import (
+    passwords,
+    settings
+)
 from pydantic import (
     BaseModel,
     EmailStr,
@@ -28,14 +32,28 @@ logger = settings.getLogger(__name__)
 
 class AuthTokenModel(base_schemas.BaseModelSchema):
     """
-    Base schema for the AuthToken model
+    Base schema for the AuthToken model. Only the hash of the token is
+    stored, the token itself (`key`) is only known when it's minted.
     """
-    key: str = Field(
-        default_factory=lambda: bcrypt.hashpw(os.urandom(64), bcrypt.gensalt()).decode('utf-8'),
-        frozen=True
-    )
+    key: Optional[str] = Field(None, exclude=True, frozen=True, repr=False)
+    key_hash: str = Field(..., frozen=True)
     updated_at: Optional[datetime.datetime] = Field(default_factory=datetime.datetime.utcnow)
 
+    @root_validator(pre=True)
+    def mint_key(cls, values):
+        """
+        Mint a new random token when the model isn't built from a stored
+        token, and hash it.
+        """
+        if not values.get('key_hash'):
+            values = dict(values)
+            if not values.get('key'):
+                values['key'] = secrets.token_urlsafe(settings.AUTH_TOKEN_BYTES)
+
+            values['key_hash'] = hash_token(values['key'])
+
+        return values
+
     @computed_field
     @property
     def expired(self) -> bool:
@@ -66,13 +84,11 @@ class UserModel(base_models.BasePKFlaskModel):
 
     @validator('password', pre=True, always=True)
     def hash_password(cls, value: Any) -> str:
-        password_hash_regex = r'^\$2[abxy]\$\d{2}\$[./0-9A-Za-z]{53}$'
-
         if value:
             # Because we pass the `password` back in on each save, we don't want to force
             # a re-hashing of the hashed version of a password
-            if not re.match(password_hash_regex, value):
-                return bcrypt.hashpw(str(value).encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            if not passwords.is_password_hash(value):
+                return passwords.hash_password(str(value))
             return value
 
         return None
@@ -91,13 +107,20 @@ class UserModel(base_models.BasePKFlaskModel):
         """
         return value.title()
 
+    @classmethod
+    def response_fields(cls) -> Set[str]:
+        """
+        Fields returned in the user API responses.
+        """
+        return {field.alias if field.alias else name for name, field in UserObjectResponseSchema.__fields__.items()}
+
     def model_dump(self, override: bool = True, additional: set = None, **kwargs):
         """
         Override base Pydantic model_dump method to include only
         the field's we'd want to return if `include` is not provided.
         """
         if override:
-            kwargs['include'] = {field.alias if field.alias else name for name, field in UserObjectResponseSchema.__fields__.items()}
+            kwargs['include'] = self.response_fields()
 
         return super().model_dump(**kwargs)
 
@@ -265,4 +288,20 @@ class ExternalAuthenticationResponseSchema(base_schemas.BaseSuccessResponseSchem
     user: Dict[str, Any]
     token: Dict[str, Any]
 
+
+class ExternalBatchAuthenticationRequestSchema(BaseModel):
+    tokens: List[str] = Field(..., min_length=1, max_length=settings.AUTH_BATCH_MAX_TOKENS)
+
+
+class ExternalBatchAuthenticationResultSchema(BaseModel):
+    token_hash: str
+    authenticated: bool = False
+    message: Optional[str] = None
+    user: Optional[Dict[str, Any]] = None
+    token: Optional[Dict[str, Any]] = None
+
+
+class ExternalBatchAuthenticationResponseSchema(base_schemas.BaseSuccessResponseSchema):
+    results: List[ExternalBatchAuthenticationResultSchema] = list()
+
 # endregion
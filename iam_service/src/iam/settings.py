@@ -1,11 +1,15 @@
 import logging
 
+from fim.advisor import QueryShape
 from flask import config
 from flask_openapi3 import (
     Contact,
     Info
 )
-from pymongo import IndexModel
+from pymongo import (
+    ASCENDING,
+    IndexModel
+)
 
 # TODO: Move values to ENV variables
 
@@ -27,18 +31,80 @@ API_TOKEN_SECURITY = [{'apiKey': []}]
 SECURITY_SCHEMES = {'apiKey': API_KEY_SCHEME}
 
 MAX_TOKEN_AGE_SECONDS = 14_400  # 4 hours
+AUTH_TOKEN_BYTES      = 32      # Random bytes in a minted (unsigned) token
+AUTH_BATCH_MAX_TOKENS = 100     # Tokens per `/authenticate/batch` request
+
+# Sliding token expiry: a token's `updated_at` is refreshed at most once per
+# interval, buffered in Redis and flushed to MongoDB in batches
+TOKEN_REFRESH_INTERVAL_SECONDS       = 300
+TOKEN_REFRESH_FLUSH_INTERVAL_SECONDS = 30
+# Flush from a thread of the serving process (`python app.py`). Other
+# deployments run `flask --app app flush-token-refreshes` on a schedule.
+TOKEN_REFRESH_FLUSHER_ENABLED        = True
+
+# Password hashing settings (`iam.passwords`)
+BCRYPT_ROUNDS                 = 12
+PASSWORD_POOL_WORKERS         = 2
+PASSWORD_POOL_MAX_PENDING     = 16  # Hashes queued or running before new ones get a 503
+PASSWORD_POOL_TIMEOUT_SECONDS = 5
+
+# Signed access tokens (`fim.tokens`). When enabled, login issues HMAC signed
+# tokens that other services verify locally with the same key set. Keep the
+# retired keys in `AUTH_SIGNING_KEYS` until their tokens have expired.
+AUTH_SIGNED_TOKENS_ENABLED = False
+AUTH_SIGNING_KEY_ID        = 'dev'
+AUTH_SIGNING_KEYS          = {
+    AUTH_SIGNING_KEY_ID: 'insecure-signing-key'
+}
 
 
 # MongoDB settings
 MONGO_USERNAME = 'docker'
 MONGO_PASSWORD = 'docker'
 MONGO_DB_NAME  = 'flask_inventory_management_dev'
+
+MONGO_MAX_POOL_SIZE               = 100
+MONGO_MIN_POOL_SIZE               = 5
+MONGO_MAX_IDLE_TIME_MS            = 60_000
+MONGO_CONNECT_TIMEOUT_MS          = 2_000
+MONGO_SERVER_SELECTION_TIMEOUT_MS = 5_000
+MONGO_SOCKET_TIMEOUT_MS           = 10_000
+MONGO_COMPRESSORS                 = 'zlib'
+
+MONGO_CLIENT_OPTIONS = dict(
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    compressors=MONGO_COMPRESSORS
+)
 MONGO_COLLECTION_NAME = 'users'
 
 MONGO_INDEXES = {
     MONGO_COLLECTION_NAME: [
         IndexModel([('pk')], name='users_pk_unique', unique=True),
-        IndexModel([('username')], name='username_unique', unique=True)
+        IndexModel([('username')], name='username_unique', unique=True),
+        # Keyset pagination seeks on (<order_by field>, pk)
+        IndexModel([('email', ASCENDING), ('pk', ASCENDING)], name='email_pk'),
+        IndexModel([('username', ASCENDING), ('pk', ASCENDING)], name='username_pk'),
+        IndexModel([('first_name', ASCENDING), ('pk', ASCENDING)], name='first_name_pk'),
+        IndexModel([('last_name', ASCENDING), ('pk', ASCENDING)], name='last_name_pk'),
+        IndexModel([('created_at', ASCENDING), ('pk', ASCENDING)], name='created_at_pk'),
+        IndexModel([('updated_at', ASCENDING), ('pk', ASCENDING)], name='updated_at_pk'),
+        IndexModel([('auth_token.key_hash', ASCENDING)], name='auth_token_key_hash', sparse=True)
+    ]
+}
+
+# Query shapes issued by the APIs, replayed through explain() by the index advisor.
+# The list API shapes are derived from the models (see `utils.advise_indexes`).
+MONGO_QUERY_SHAPES = {
+    MONGO_COLLECTION_NAME: [
+        QueryShape('detail', {'pk': 1}),
+        QueryShape('find by email', {'email': 'user@example.com'}),
+        QueryShape('token authentication', {'auth_token.key_hash': 'hash'}),
+        QueryShape('bulk delete', {'pk': {'$in': [1, 2]}})
     ]
 }
 
@@ -48,9 +114,29 @@ REDIS_HOST = 'localhost'
 REDIS_PORT = 6379
 REDIS_DB   = 0
 
+REDIS_MAX_CONNECTIONS        = 50
+REDIS_SOCKET_TIMEOUT         = 5
+REDIS_SOCKET_CONNECT_TIMEOUT = 2
+REDIS_HEALTH_CHECK_INTERVAL  = 30
+REDIS_DECODE_RESPONSES       = True
+
+REDIS_POOL_OPTIONS = dict(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+    decode_responses=REDIS_DECODE_RESPONSES
+)
+
 SERVICE_CACHE_PREFIX     = 'iam'
 SERVICE_CACHE_EXPIRATION = 1_800  # 30 minutes
 
+TOKEN_REFRESH_BUFFER_KEY = f'{SERVICE_CACHE_PREFIX}:token-refreshes'
+TOKEN_REFRESH_LOCK_KEY   = f'{SERVICE_CACHE_PREFIX}:token-refresh-lock'
+
 
 # CORS settings
 CORS_RESOURCES = {r'/api/v1/iam/*': {'origins': f'http://localhost:{PORT}'}}
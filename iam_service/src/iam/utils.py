@@ -1,17 +1,35 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import datetime
+import threading
+import time
+import uuid
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    List
+)
 
+from fim import (
+    advisor,
+    tokens
+)
 from iam import (
     db,
     models,
+    redis_conn,
+    redis_pipeline,
     settings
 )
+from iam.constants import UserOrderOnEnum
+from pymongo import UpdateOne
+from redis import ResponseError
 
 logger = settings.getLogger(__name__)
 
 
 if TYPE_CHECKING:
+    from fim.advisor import QueryShapeReport
     from flask_pymongo import PyMongo
 
 
@@ -33,6 +51,25 @@ def setup_database_indexes(database: PyMongo = db):
                 pass
 
 
+def advise_indexes(database: PyMongo = db) -> List[QueryShapeReport]:
+    """
+    Replay the API query shapes through explain() and flag the ones that
+    scan the whole collection or sort in memory.
+    """
+    logger.info('Explaining API query shapes...')
+
+    order_on     = [choice.value for choice in UserOrderOnEnum]
+    query_shapes = {collection_name: list(shapes) for collection_name, shapes in settings.MONGO_QUERY_SHAPES.items()}
+
+    query_shapes[settings.MONGO_COLLECTION_NAME] = [
+        *advisor.list_query_shapes(models.User, order_on=order_on),
+        *advisor.list_query_shapes(models.User, order_on=['id'], filters={'id': [1, 2]}, name='list filtered by id_in'),
+        *query_shapes.get(settings.MONGO_COLLECTION_NAME, [])
+    ]
+
+    return advisor.advise_indexes(database=database, query_shapes=query_shapes)
+
+
 def login_user(user: models.User) -> models.IAMAuthToken:
     """
     Fetch a user's auth token or create a new one
@@ -40,7 +77,17 @@ def login_user(user: models.User) -> models.IAMAuthToken:
     logger.info('[%s] Generating new user auth token', user.email)
     del user.token
 
-    token      = models.IAMAuthToken()
+    if settings.AUTH_SIGNED_TOKENS_ENABLED:
+        key = tokens.sign_token(
+            claims={'sub': str(user.id), 'su': user.is_superuser},
+            keys=settings.AUTH_SIGNING_KEYS,
+            kid=settings.AUTH_SIGNING_KEY_ID,
+            expires_in=settings.MAX_TOKEN_AGE_SECONDS
+        )
+        token = models.IAMAuthToken(key=key)
+    else:
+        token = models.IAMAuthToken()
+
     user.token = token
 
     try:
@@ -50,3 +97,77 @@ def login_user(user: models.User) -> models.IAMAuthToken:
         raise
 
     return token
+
+
+def flush_token_refreshes() -> int:
+    """
+    Write the token refreshes buffered by `User.refresh_token` to MongoDB
+    in a single bulk write. Returns the number of refreshed tokens.
+    """
+    # Unique per flush, so overlapping flushers never overwrite or delete
+    # each other's batch
+    flushing_key = f'{settings.TOKEN_REFRESH_BUFFER_KEY}:flushing:{uuid.uuid4().hex}'
+
+    # Move the buffer aside atomically so new refreshes keep buffering, and
+    # concurrent flushers don't write the same batch twice
+    try:
+        redis_conn.rename(settings.TOKEN_REFRESH_BUFFER_KEY, flushing_key)
+    except ResponseError:
+        return 0
+
+    refreshes  = redis_conn.hgetall(flushing_key)
+    operations = [
+        UpdateOne(
+            {'auth_token.key_hash': key_hash},
+            {'$max': {'auth_token.updated_at': datetime.datetime.utcfromtimestamp(float(refreshed_at))}}
+        )
+        for key_hash, refreshed_at in refreshes.items()
+    ]
+
+    modified = 0
+    if operations:
+        try:
+            result   = models.User.collection.bulk_write(operations, ordered=False)
+            modified = result.modified_count
+        except Exception:
+            logger.exception('Error writing %s user auth token refreshes, returning them to the buffer', len(operations))
+            requeue_token_refreshes(flushing_key=flushing_key, refreshes=refreshes)
+            raise
+
+    redis_conn.delete(flushing_key)
+
+    logger.info('Flushed %s user auth token refreshes', modified)
+
+    return modified
+
+
+def requeue_token_refreshes(flushing_key: str, refreshes: Dict[str, str]) -> None:
+    """
+    Merge a batch that failed to flush back into the refresh buffer, so the
+    next flush retries it. Refreshes buffered since the batch was moved aside
+    are newer and win.
+    """
+    with redis_pipeline(transaction=True) as pipe:
+        for key_hash, refreshed_at in refreshes.items():
+            pipe.hsetnx(settings.TOKEN_REFRESH_BUFFER_KEY, key_hash, refreshed_at)
+
+        pipe.delete(flushing_key)
+
+
+def start_token_refresh_flusher() -> threading.Thread:
+    """
+    Flush the buffered token refreshes periodically from a daemon thread.
+    """
+    def run():
+        while True:
+            time.sleep(settings.TOKEN_REFRESH_FLUSH_INTERVAL_SECONDS)
+
+            try:
+                flush_token_refreshes()
+            except Exception:
+                logger.exception('Error flushing user auth token refreshes')
+
+    thread = threading.Thread(target=run, name='token-refresh-flusher', daemon=True)
+    thread.start()
+
+    return thread
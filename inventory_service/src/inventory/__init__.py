@@ -1,72 +1,88 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
 from elasticsearch import Elasticsearch
 from flask import (
-    current_app,
-    g
+    Flask,
+    current_app
 )
 from flask_pymongo import PyMongo
 from inventory import settings
-from redis import Redis
+from redis import (
+    ConnectionPool,
+    Redis
+)
+from redis.client import Pipeline
 from rq import Queue
 from werkzeug.local import LocalProxy
 
 logger = settings.getLogger(__name__)
 
+# Process-wide MongoClient (and connection pool), initialized in `create_app`
+mongo      = PyMongo()
+mongo_lock = threading.Lock()
 
-def get_db():
-    """
-    Configuration method to return db instance
-    """
-    db = getattr(g, "_database", None)
-
-    if db is None:
-        db = g._database = PyMongo(current_app).db
+# Process-wide Redis connection pool. Connections are opened lazily and the
+# pool resets itself after a fork, so it is safe to create at import time.
+redis_pool = ConnectionPool(**settings.REDIS_POOL_OPTIONS)
+redis_conn = Redis(connection_pool=redis_pool)
 
-    return db
+# Process-wide Elasticsearch client (and HTTP connection pool)
+es_client: Elasticsearch = None
+es_lock                  = threading.Lock()
 
 
-def get_redis_conn():
+def init_db(app: Flask) -> PyMongo:
     """
-    Configuration method to return Redis instance
+    Configuration method to create the shared MongoClient for the process
     """
-    redis_conn = getattr(g, '_redis_conn', None)
+    with mongo_lock:
+        if mongo.cx is None:
+            mongo.init_app(app, **settings.MONGO_CLIENT_OPTIONS)
 
-    if redis_conn is None:
-        redis_conn = g._redis = Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=settings.REDIS_DB,
-            decode_responses=True
-        )
+    return mongo
 
-    return redis_conn
 
-
-def get_redis_queue():
+def get_db():
     """
-    Configuration method to return rq Queue instance
+    Configuration method to return db instance
     """
-    redis_queue = getattr(g, '_redis_queue', None)
+    if mongo.db is None:
+        init_db(current_app)
 
-    if redis_queue is None:
-        redis_conn  = get_redis_conn()
-        redis_queue = g._redis_queue = Queue(connection=redis_conn, name='inventory-service')
+    return mongo.db
 
-    return redis_queue
+
+@contextmanager
+def redis_pipeline(transaction: bool = False) -> Iterator[Pipeline]:
+    """
+    Batch several Redis commands into a single round trip on the shared
+    pool. The commands are executed when the block exits cleanly.
+    """
+    with redis_conn.pipeline(transaction=transaction) as pipe:
+        yield pipe
+        pipe.execute()
 
 
 def get_elasticsearch():
     """
-    Configuration method to return an elasticsearch instance
+    Configuration method to return the process-wide elasticsearch instance
     """
-    es = getattr(g, '_es', None)
+    global es_client
 
-    if es is None:
-        es = g._es = Elasticsearch(hosts=[current_app.config['ELASTICSEARCH_URL']])
+    if es_client is None:
+        with es_lock:
+            if es_client is None:
+                es_client = Elasticsearch(
+                    hosts=[settings.ELASTICSEARCH_URL],
+                    **settings.ELASTICSEARCH_CLIENT_OPTIONS
+                )
 
-    return es
+    return es_client
 
 
 db          = LocalProxy(get_db)
-cache       = LocalProxy(get_redis_conn)
-redis_queue = LocalProxy(get_redis_queue)
+cache       = redis_conn
+redis_queue = Queue(connection=redis_conn, name='inventory-service')
 es          = LocalProxy(get_elasticsearch)
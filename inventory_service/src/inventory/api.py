@@ -10,8 +10,10 @@ from fim.api import (
     BaseSearchAPI
 )
 from fim.authentication import protected_view
+from fim.constants import SearchSourceEnum
 from fim.schemas import (
     BadRequestResponseSchema,
+    ServiceUnavailableResponseSchema,
     UnauthorizedResponseSchema
 )
 from flask import jsonify
@@ -66,7 +68,8 @@ class InventoryCreateAPI(BaseCreateAPI):
         responses={
             HTTPStatus.CREATED: response_schema,
             HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
-            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema
+            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=settings.API_TOKEN_SECURITY
     )
@@ -96,7 +99,8 @@ class InventoryBulkCreateAPI(BaseBulkCreateAPI):
         responses={
             HTTPStatus.CREATED: response_schema,
             HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
-            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema
+            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=settings.API_TOKEN_SECURITY
     )
@@ -125,7 +129,8 @@ class InventoryListAPI(BaseListAPI):
         responses={
             HTTPStatus.OK: response_schema,
             HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
-            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema
+            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=settings.API_TOKEN_SECURITY
     )
@@ -159,7 +164,8 @@ class InventoryDetailAPI(BaseDetailAPI):
         responses={
             HTTPStatus.OK: response_schema,
             HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
-            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema
+            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=settings.API_TOKEN_SECURITY
     )
@@ -175,7 +181,8 @@ class InventoryDetailAPI(BaseDetailAPI):
         responses={
             HTTPStatus.OK: response_schema,
             HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
-            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema
+            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=settings.API_TOKEN_SECURITY
     )
@@ -191,7 +198,8 @@ class InventoryDetailAPI(BaseDetailAPI):
         responses={
             HTTPStatus.RESET_CONTENT: response_schema,
             HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
-            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema
+            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=settings.API_TOKEN_SECURITY
     )
@@ -213,6 +221,9 @@ class InventorySearchAPI(BaseSearchAPI):
     model = models.Inventory
     index = inventory_item_index
 
+    # Only the response fields are pulled from the index
+    search_source = SearchSourceEnum.Fields.value
+
     @service_api_v1.doc(
         tags=[inventory_tag],
         operation_id='Inventory Search API POST',
@@ -221,7 +232,8 @@ class InventorySearchAPI(BaseSearchAPI):
         responses={
             HTTPStatus.OK: response_schema,
             HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
-            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema
+            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=settings.API_TOKEN_SECURITY
     )
@@ -251,7 +263,8 @@ class InventoryBulkDeleteAPI(BaseBulkDeleteAPI):
         responses={
             HTTPStatus.RESET_CONTENT: response_schema,
             HTTPStatus.BAD_REQUEST: BadRequestResponseSchema,
-            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema
+            HTTPStatus.UNAUTHORIZED: UnauthorizedResponseSchema,
+            HTTPStatus.SERVICE_UNAVAILABLE: ServiceUnavailableResponseSchema
         },
         security=settings.API_TOKEN_SECURITY
     )
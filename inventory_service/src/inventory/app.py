@@ -1,6 +1,9 @@
 from flask_cors import CORS
 from flask_openapi3 import OpenAPI
-from inventory import settings
+from inventory import (
+    init_db,
+    settings
+)
 
 cors = CORS()
 
@@ -10,6 +13,7 @@ def create_app():
 
     app.config.from_object(settings.FlaskConfig)
     cors.init_app(app, resources=settings.CORS_RESOURCES)
+    init_db(app)
 
     with app.app_context():
         from inventory import utils
@@ -17,9 +21,35 @@ def create_app():
         utils.setup_database_indexes()
         utils.prepare_es_indexes()
 
+    register_commands(app)
+
     return app
 
 
+def register_commands(app: OpenAPI):
+    @app.cli.command('index-advisor')
+    def index_advisor():
+        """
+        Explain the API query shapes and fail if any of them scans the whole collection.
+        """
+        from inventory import utils
+
+        flagged = utils.advise_indexes()
+        if any(report.collscan for report in flagged):
+            raise SystemExit(1)
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """
+        Recreate the Elasticsearch index and reindex every item from MongoDB.
+        """
+        from inventory import utils
+
+        result = utils.rebuild_es_index()
+        if result['errors']:
+            raise SystemExit(1)
+
+
 def register_apis(app: OpenAPI):
     with app.app_context():
         from api import service_api_v1
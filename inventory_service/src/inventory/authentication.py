@@ -5,15 +5,28 @@ from typing import (
     Optional
 )
 
-import requests
 from fim import schemas as base_schemas
-from fim.authentication import BaseAuthentication
+from fim.authentication import (
+    BaseAuthentication,
+    hash_token
+)
+from fim.tokens import (
+    ExpiredTokenError,
+    InvalidTokenError,
+    is_signed_token,
+    verify_token
+)
 from flask import (
     g,
     jsonify,
     request
 )
 from inventory import settings
+from inventory.iam_client import (
+    IAMServiceUnavailable,
+    iam_client
+)
+from inventory.token_cache import token_cache
 
 
 @dataclass
@@ -21,9 +34,6 @@ class TokenAuthentication(BaseAuthentication):
     user: Optional[Dict]  = None
     token: Optional[Dict] = None
 
-    def __init__(self):
-        self.__class__.validate_request()
-
     @classmethod
     def _extract_request_token(cls) -> Optional[str]:
         auth_header = request.headers.get('Authorization', '')
@@ -32,30 +42,74 @@ class TokenAuthentication(BaseAuthentication):
 
         return None
 
-    @classmethod
-    def __prepare_user_data(cls, user_data: Dict) -> None:
+    def __prepare_user_data(self, user_data: Dict) -> None:
         user_data['id'] = base_schemas.FIMObjectID(user_data['id'])
-        cls.user = user_data
+        self.user = user_data
 
-    @classmethod
-    def validate_request(cls) -> None:
-        token_key = cls._extract_request_token()
+    def _verify_signed_token(self, token_key: str, token_hash: str) -> Optional[Dict]:
+        """
+        Verify a signed token locally, without calling IAM. Returns `None` if
+        the revocation list can't be checked, so IAM has the final say.
+        """
+        claims = verify_token(token_key, keys=settings.AUTH_SIGNING_KEYS)
+
+        revoked = token_cache.is_revoked(token_hash)
+        if revoked is None:
+            return None
+
+        if revoked:
+            raise InvalidTokenError('revoked token')
+
+        user_data = {'id': claims['sub'], 'is_superuser': claims.get('su', False)}
+        return {'user': user_data, 'token': claims}
+
+    def validate_request(self) -> None:
+        token_key = self._extract_request_token()
         if not token_key:
             response_body = base_schemas.UnauthorizedResponseSchema(message='missing authorization header').dict()
 
-            cls.authenticated = False
-            cls.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
+            self.authenticated = False
+            self.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
             return
 
-        auth_response = requests.post(f'{settings.IAM_SERVICE_API_BASE_URL}/{settings.IAM_SERVICE_ENDPOINTS["authentication"]}', headers={'Authorization': f'token {token_key}'})
-        if auth_response.status_code != HTTPStatus.OK:
-            cls.authenticated = False
-            cls.response      = auth_response.json(), HTTPStatus.UNAUTHORIZED
-            return
+        token_hash = hash_token(token_key)
+        auth_data  = None
+
+        if is_signed_token(token_key):
+            try:
+                auth_data = self._verify_signed_token(token_key, token_hash)
+            except InvalidTokenError as e:
+                message       = 'expired token' if isinstance(e, ExpiredTokenError) else str(e)
+                response_body = base_schemas.UnauthorizedResponseSchema(message=message).dict()
+
+                self.authenticated = False
+                self.response      = jsonify(response_body), HTTPStatus.UNAUTHORIZED
+                return
+
+        if auth_data is None:
+            auth_data = token_cache.get(token_hash)
+
+        if auth_data is None:
+            try:
+                auth_response = iam_client.authenticate(token_key)
+            except IAMServiceUnavailable as e:
+                response_body = base_schemas.ServiceUnavailableResponseSchema(message=str(e)).dict()
+
+                self.authenticated = False
+                self.response      = jsonify(response_body), HTTPStatus.SERVICE_UNAVAILABLE
+                return
+
+            if auth_response.status_code != HTTPStatus.OK:
+                self.authenticated = False
+                self.response      = auth_response.json(), HTTPStatus.UNAUTHORIZED
+                return
+
+            auth_data  = auth_response.json()
+            expires_in = auth_data['token'].get('expires_in', settings.MAX_TOKEN_AGE_SECONDS)
+            token_cache.set(token_hash, auth_data, expires_in=expires_in)
 
-        auth_data         = auth_response.json()
-        cls.token         = auth_data['token']
-        cls.authenticated = True
+        self.token         = auth_data['token']
+        self.authenticated = True
 
-        cls.__prepare_user_data(user_data=auth_data['user'])
-        g.user = cls.user
+        self.__prepare_user_data(user_data=auth_data['user'])
+        g.user = self.user
@@ -0,0 +1,187 @@
+"""
+HTTP client for the IAM service.
+
+Every authenticated inventory request calls IAM, so the client keeps a
+pooled keep-alive `requests.Session` for the whole process, bounds every
+call with connect/read timeouts and limited retries, and stops calling IAM
+for a while once it keeps failing (circuit breaker) so that inventory
+workers are not tied up waiting on an unhealthy dependency.
+"""
+import threading
+import time
+from http import HTTPStatus
+from typing import (
+    Dict,
+    Tuple
+)
+
+import requests
+from inventory import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = settings.getLogger(__name__)
+
+
+class IAMServiceUnavailable(Exception):
+    """
+    Raised when the IAM service can't be reached, keeps failing, or the
+    circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Minimal thread-safe circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast for `reset_timeout` seconds. Afterwards a single trial
+    call is let through (half-open); its outcome closes or re-opens the
+    circuit.
+    """
+    CLOSED    = 'closed'
+    OPEN      = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout     = reset_timeout
+
+        self._state     = self.CLOSED
+        self._failures  = 0
+        self._opened_at = 0.0
+        self._lock      = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'<CircuitBreaker {self.state} ({self._failures} failures)>'
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Let a single trial call through
+                self._state = self.HALF_OPEN
+                return True
+
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state    = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning('IAM circuit breaker opened after %s failures', self._failures)
+
+                self._state     = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class IAMClient:
+    """
+    Process-wide client for the IAM service API
+    """
+    def __init__(
+        self,
+        base_url: str,
+        endpoints: Dict[str, str],
+        timeout: Tuple[float, float],
+        max_retries: int,
+        retry_backoff: float,
+        pool_connections: int,
+        pool_maxsize: int,
+        breaker: CircuitBreaker
+    ):
+        self.base_url  = base_url.rstrip('/')
+        self.endpoints = endpoints
+        self.timeout   = timeout
+        self.breaker   = breaker
+
+        # Authentication calls are read-only on the IAM side, so POSTs are
+        # safe to retry on connection errors and gateway failures.
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=retry_backoff,
+            status_forcelist=(
+                HTTPStatus.BAD_GATEWAY,
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                HTTPStatus.GATEWAY_TIMEOUT
+            ),
+            allowed_methods=frozenset({'GET', 'POST'}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __repr__(self) -> str:
+        return f'<IAMClient {self.base_url} {self.breaker.state}>'
+
+    def url(self, endpoint: str) -> str:
+        return f'{self.base_url}/{self.endpoints[endpoint]}'
+
+    def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """
+        Send a request to IAM through the pooled session.
+
+        Raises `IAMServiceUnavailable` instead of waiting on IAM when the
+        circuit is open, when IAM can't be reached in time, or when it
+        answers with a server error.
+        """
+        if not self.breaker.allow_request():
+            raise IAMServiceUnavailable('IAM service circuit is open')
+
+        kwargs.setdefault('timeout', self.timeout)
+
+        try:
+            response = self.session.request(method, self.url(endpoint), **kwargs)
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            logger.error('IAM service request failed: %s', e)
+            raise IAMServiceUnavailable('IAM service is unreachable') from e
+
+        if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            self.breaker.record_failure()
+            logger.error('IAM service responded with %s', response.status_code)
+            raise IAMServiceUnavailable('IAM service is unavailable')
+
+        self.breaker.record_success()
+        return response
+
+    def authenticate(self, token_key: str) -> requests.Response:
+        """
+        Validate an API token against IAM
+        """
+        return self.request('POST', 'authentication', headers={'Authorization': f'token {token_key}'})
+
+
+iam_client = IAMClient(
+    base_url=settings.IAM_SERVICE_API_BASE_URL,
+    endpoints=settings.IAM_SERVICE_ENDPOINTS,
+    timeout=(settings.IAM_SERVICE_CONNECT_TIMEOUT, settings.IAM_SERVICE_READ_TIMEOUT),
+    max_retries=settings.IAM_SERVICE_MAX_RETRIES,
+    retry_backoff=settings.IAM_SERVICE_RETRY_BACKOFF,
+    pool_connections=settings.IAM_SERVICE_POOL_CONNECTIONS,
+    pool_maxsize=settings.IAM_SERVICE_POOL_MAXSIZE,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.IAM_SERVICE_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.IAM_SERVICE_BREAKER_RESET_TIMEOUT
+    )
+)
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from typing import (
     TYPE_CHECKING,
-    Dict
+    Dict,
+    List,
+    Optional,
+    Set
 )
 
 from flask_pymongo.wrappers import Collection
@@ -13,7 +16,9 @@ from inventory import (
 )
 from inventory.tasks import (
     add_item_to_index,
+    add_items_to_index,
     delete_item_in_index,
+    delete_items_in_index,
     update_item_in_index
 )
 
@@ -21,6 +26,8 @@ logger = settings.getLogger(__name__)
 
 
 if TYPE_CHECKING:
+    from elasticsearch import Elasticsearch
+    from fim.schemas import FIMObjectID
     from flask_pymongo import PyMongo
 
 
@@ -41,6 +48,13 @@ class Inventory(schemas.InventoryModel):
     def collection(cls) -> Collection:
         return getattr(cls.db, settings.MONGO_COLLECTION_NAME)
 
+    @classmethod
+    @property
+    def es(cls) -> Elasticsearch:
+        from inventory import es
+
+        return es
+
     @property
     def user(self) -> Dict:
         from flask import g
@@ -69,11 +83,28 @@ class Inventory(schemas.InventoryModel):
         logger.info('Queued job %s to add an item to the %s index', job.id, index)
         return
 
-    def update_index(self, index: str) -> None:
+    @classmethod
+    def add_many_to_index(cls, index: str, objs: List[Inventory]) -> None:
         """
-        Update a document in the search index.
+        Add many documents to the search index with a single job.
         """
-        job = queue.enqueue(update_item_in_index, index_name=index, item=self, user=self.user)
+        from flask import g
+
+        job = queue.enqueue(add_items_to_index, index_name=index, items=objs, user=getattr(g, 'user', None))
+        logger.info('Queued job %s to add %s items to the %s index', job.id, len(objs), index)
+        return
+
+    def update_index(self, index: str, fields: Optional[Set[str]] = None) -> None:
+        """
+        Update a document in the search index, optionally limited to the
+        given fields.
+        """
+        if fields is not None:
+            fields = fields & self.response_fields()
+            if not fields:
+                return
+
+        job = queue.enqueue(update_item_in_index, index_name=index, item=self, user=self.user, fields=fields)
         logger.info('Queued job %s to update an item in the %s index', job.id, index)
         return
 
@@ -85,5 +116,14 @@ class Inventory(schemas.InventoryModel):
         logger.info('Queued job %s to delete an item in the %s index', job.id, index)
         return
 
+    @classmethod
+    def remove_many_from_index(cls, index: str, ids: List[FIMObjectID]) -> None:
+        """
+        Remove many documents from the search index with a single job.
+        """
+        job = queue.enqueue(delete_items_in_index, index_name=index, item_ids=ids)
+        logger.info('Queued job %s to delete %s items in the %s index', job.id, len(ids), index)
+        return
+
     def __repr__(self):
         return f'<{self.__class__.__name__}: {self.name} ({self.pk})>'
@@ -1,6 +1,7 @@
 from typing import (
     List,
-    Optional
+    Optional,
+    Set
 )
 
 from fim import models as base_models
@@ -58,6 +59,13 @@ class InventoryModel(base_models.BasePKFlaskModel):
         """
         return float(f'{float(value):.2f}')
 
+    @classmethod
+    def response_fields(cls) -> Set[str]:
+        """
+        Fields returned in the inventory item API responses.
+        """
+        return {field.alias if field.alias else name for name, field in InventoryObjectResponseSchema.__fields__.items()}
+
     def model_dump(self, override: bool = True, **kwargs):
         """
         Override base Pydantic model_dump method to include only
@@ -65,7 +73,7 @@ class InventoryModel(base_models.BasePKFlaskModel):
         """
         if override:
             if not kwargs.get('include', None):
-                kwargs['include'] = {field.alias if field.alias else name for name, field in InventoryObjectResponseSchema.__fields__.items()}
+                kwargs['include'] = self.response_fields()
 
         return super().model_dump(**kwargs)
 
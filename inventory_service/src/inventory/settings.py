@@ -1,11 +1,16 @@
 import logging
 
+from bson import ObjectId
+from fim.advisor import QueryShape
 from flask import config
 from flask_openapi3 import (
     Contact,
     Info
 )
-from pymongo import IndexModel
+from pymongo import (
+    ASCENDING,
+    IndexModel
+)
 
 # TODO: Move values to ENV variables
 
@@ -28,16 +33,61 @@ SECURITY_SCHEMES = {'apiKey': API_KEY_SCHEME}
 
 MAX_TOKEN_AGE_SECONDS = 14_400  # 4 hours
 
+# Key set used to verify signed access tokens locally (`fim.tokens`), must
+# match the IAM service's `AUTH_SIGNING_KEYS`
+AUTH_SIGNING_KEYS = {
+    'dev': 'insecure-signing-key'
+}
+
 
 # MongoDB settings
 MONGO_USERNAME = 'docker'
 MONGO_PASSWORD = 'docker'
 MONGO_DB_NAME  = 'flask_inventory_management_dev'
+
+MONGO_MAX_POOL_SIZE               = 100
+MONGO_MIN_POOL_SIZE               = 5
+MONGO_MAX_IDLE_TIME_MS            = 60_000
+MONGO_CONNECT_TIMEOUT_MS          = 2_000
+MONGO_SERVER_SELECTION_TIMEOUT_MS = 5_000
+MONGO_SOCKET_TIMEOUT_MS           = 10_000
+MONGO_COMPRESSORS                 = 'zlib'
+
+MONGO_CLIENT_OPTIONS = dict(
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    compressors=MONGO_COMPRESSORS
+)
 MONGO_COLLECTION_NAME = 'inventory'
 
 MONGO_INDEXES = {
     MONGO_COLLECTION_NAME: [
-        IndexModel([('pk')], name='users_pk_unique', unique=True)
+        IndexModel([('pk')], name='users_pk_unique', unique=True),
+        # Keyset pagination seeks on (user_id, <order_by field>, pk)
+        IndexModel([('user_id', ASCENDING), ('pk', ASCENDING)], name='user_id_pk'),
+        IndexModel([('user_id', ASCENDING), ('name', ASCENDING), ('pk', ASCENDING)], name='user_id_name_pk'),
+        IndexModel([('user_id', ASCENDING), ('created_at', ASCENDING), ('pk', ASCENDING)], name='user_id_created_at_pk'),
+        IndexModel([('user_id', ASCENDING), ('updated_at', ASCENDING), ('pk', ASCENDING)], name='user_id_updated_at_pk')
+    ]
+}
+
+# Query shapes issued by the APIs, replayed through explain() by the index advisor.
+# The list API shapes are derived from the models (see `utils.advise_indexes`).
+_USER_ID = ObjectId()
+
+MONGO_QUERY_SHAPES = {
+    MONGO_COLLECTION_NAME: [
+        QueryShape(
+            'list page after cursor',
+            {'user_id': _USER_ID, '$or': [{'name': {'$gt': 'a'}}, {'name': 'a', 'pk': {'$gt': 1}}]},
+            [('name', ASCENDING), ('pk', ASCENDING)]
+        ),
+        QueryShape('detail', {'pk': 1, 'user_id': _USER_ID}),
+        QueryShape('bulk delete', {'user_id': _USER_ID, 'pk': {'$in': [1, 2]}})
     ]
 }
 
@@ -47,9 +97,32 @@ REDIS_HOST = 'localhost'
 REDIS_PORT = 6379
 REDIS_DB   = 0
 
+REDIS_MAX_CONNECTIONS        = 50
+REDIS_SOCKET_TIMEOUT         = 5
+REDIS_SOCKET_CONNECT_TIMEOUT = 2
+REDIS_HEALTH_CHECK_INTERVAL  = 30
+# RQ pickles job payloads, so the shared pool must return raw bytes
+REDIS_DECODE_RESPONSES       = False
+
+REDIS_POOL_OPTIONS = dict(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+    decode_responses=REDIS_DECODE_RESPONSES
+)
+
 SERVICE_CACHE_PREFIX     = 'inventory'
 SERVICE_CACHE_EXPIRATION = 1_800  # 30 minutes
 
+# `inventory.token_cache` settings, the TTLs are further bounded by token expiry
+AUTH_TOKEN_CACHE_SECONDS       = 300
+AUTH_TOKEN_LOCAL_CACHE_SECONDS = 10
+AUTH_TOKEN_LOCAL_CACHE_SIZE    = 4_096
+
 RQ_DASHBOARD_REDIS_URL = f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}'
 REDIS_RQ_DASHBOARD_URL_PREFIX = '/rq/inventory'
 
@@ -59,17 +132,96 @@ ELASTICSEARCH_PORT = 9200
 ELASTICSEARCH_BASE_URL = 'http://localhost'
 ELASTICSEARCH_URL = f'{ELASTICSEARCH_BASE_URL}:{ELASTICSEARCH_PORT}'
 
+ELASTICSEARCH_CONNECTIONS_PER_NODE       = 25
+ELASTICSEARCH_REQUEST_TIMEOUT            = 5
+ELASTICSEARCH_MAX_RETRIES                = 3
+ELASTICSEARCH_RETRY_ON_TIMEOUT           = True
+ELASTICSEARCH_HTTP_COMPRESS              = True
+# Sniffing is off for the single-node docker setup, enable it for clusters
+ELASTICSEARCH_SNIFF_ON_START             = False
+ELASTICSEARCH_SNIFF_ON_NODE_FAILURE      = False
+ELASTICSEARCH_MIN_DELAY_BETWEEN_SNIFFING = 60
+
+ELASTICSEARCH_CLIENT_OPTIONS = dict(
+    connections_per_node=ELASTICSEARCH_CONNECTIONS_PER_NODE,
+    request_timeout=ELASTICSEARCH_REQUEST_TIMEOUT,
+    max_retries=ELASTICSEARCH_MAX_RETRIES,
+    retry_on_timeout=ELASTICSEARCH_RETRY_ON_TIMEOUT,
+    http_compress=ELASTICSEARCH_HTTP_COMPRESS,
+    sniff_on_start=ELASTICSEARCH_SNIFF_ON_START,
+    sniff_on_node_failure=ELASTICSEARCH_SNIFF_ON_NODE_FAILURE,
+    min_delay_between_sniffing=ELASTICSEARCH_MIN_DELAY_BETWEEN_SNIFFING
+)
+
+# Substring search runs `match` queries against analyzed subfields instead of
+# leading wildcards: `.ngram` holds every 2-3 character gram of a word and
+# `.prefix` every leading edge of it (see `ElasticsearchQueryInterface.search`).
+# `user_id` and `category` are keywords so exact filters on them are cheap
+# and cached; `category` is normalized so filtering on it ignores case.
+# Changing analyzers or mappings requires the index to be rebuilt with
+# `flask --app app rebuild-search-index`.
+ELASTICSEARCH_NGRAM_MIN_GRAM  = 2
+ELASTICSEARCH_NGRAM_MAX_GRAM  = 3
+ELASTICSEARCH_PREFIX_MAX_GRAM = 20
+
+ELASTICSEARCH_SEARCH_SUBFIELDS = {
+    'ngram': {'type': 'text', 'analyzer': 'ngram_analyzer', 'search_analyzer': 'ngram_analyzer'},
+    'prefix': {'type': 'text', 'analyzer': 'prefix_analyzer', 'search_analyzer': 'prefix_search_analyzer'}
+}
+
 INVENTORY_ITEM_INDEX_SETTINGS = {
     'settings': {
         'number_of_shards': 1,
-        'number_of_replicas': 0
+        'number_of_replicas': 0,
+        'index': {
+            'max_ngram_diff': ELASTICSEARCH_NGRAM_MAX_GRAM - ELASTICSEARCH_NGRAM_MIN_GRAM
+        },
+        'analysis': {
+            'tokenizer': {
+                'ngram_tokenizer': {
+                    'type': 'ngram',
+                    'min_gram': ELASTICSEARCH_NGRAM_MIN_GRAM,
+                    'max_gram': ELASTICSEARCH_NGRAM_MAX_GRAM,
+                    'token_chars': ['letter', 'digit']
+                },
+                'prefix_tokenizer': {
+                    'type': 'edge_ngram',
+                    'min_gram': 1,
+                    'max_gram': ELASTICSEARCH_PREFIX_MAX_GRAM,
+                    'token_chars': ['letter', 'digit']
+                }
+            },
+            'analyzer': {
+                'ngram_analyzer': {
+                    'type': 'custom',
+                    'tokenizer': 'ngram_tokenizer',
+                    'filter': ['lowercase', 'asciifolding']
+                },
+                'prefix_analyzer': {
+                    'type': 'custom',
+                    'tokenizer': 'prefix_tokenizer',
+                    'filter': ['lowercase', 'asciifolding']
+                },
+                'prefix_search_analyzer': {
+                    'type': 'custom',
+                    'tokenizer': 'standard',
+                    'filter': ['lowercase', 'asciifolding']
+                }
+            },
+            'normalizer': {
+                'lowercase_normalizer': {
+                    'type': 'custom',
+                    'filter': ['lowercase', 'asciifolding']
+                }
+            }
+        }
     },
     'mappings': {
         'properties': {
             'pk': {'type': 'integer'},
-            'user_id': {'type': 'text'},
-            'name': {'type': 'text'},
-            'category': {'type': 'text'},
+            'user_id': {'type': 'keyword'},
+            'name': {'type': 'text', 'fields': ELASTICSEARCH_SEARCH_SUBFIELDS},
+            'category': {'type': 'keyword', 'normalizer': 'lowercase_normalizer', 'fields': ELASTICSEARCH_SEARCH_SUBFIELDS},
             'weight': {'type': 'float'},
             'price': {'type': 'float'}
         }
@@ -84,13 +236,22 @@ ELASTICSEARCH_INDEXES = {
 
 # External API settings
 # TODO: This should receive its own hostname after NGINX is setup
-# TODO: There should also be an interface for accessing this "external service"
 IAM_SERVICE_API_PORT     = 5000
 IAM_SERVICE_API_BASE_URL = f'http://iam-service:{IAM_SERVICE_API_PORT}/api/v1/iam'
 IAM_SERVICE_ENDPOINTS    = {
     'authentication': 'authenticate'
 }
 
+# `inventory.iam_client` settings
+IAM_SERVICE_CONNECT_TIMEOUT           = 1  # seconds
+IAM_SERVICE_READ_TIMEOUT              = 3  # seconds
+IAM_SERVICE_MAX_RETRIES               = 2
+IAM_SERVICE_RETRY_BACKOFF             = 0.1
+IAM_SERVICE_POOL_CONNECTIONS          = 4
+IAM_SERVICE_POOL_MAXSIZE              = 50
+IAM_SERVICE_BREAKER_FAILURE_THRESHOLD = 5
+IAM_SERVICE_BREAKER_RESET_TIMEOUT     = 30  # seconds
+
 # CORS settings
 CORS_RESOURCES = {r'/api/v1/inventory/*': {'origins': f'http://localhost:{PORT}'}}
 
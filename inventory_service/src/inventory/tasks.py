@@ -4,9 +4,13 @@ import json
 import logging
 from typing import (
     TYPE_CHECKING,
-    Dict
+    Dict,
+    List,
+    Optional,
+    Set
 )
 
+from elasticsearch import helpers
 from inventory import (
     es,
     redis_conn
@@ -40,14 +44,35 @@ def add_item_to_index(index_name: str, item: Inventory, user: dict) -> Dict:
 
 
 @job('default', connection=redis_conn, timeout=500)
-def update_item_in_index(index_name: str, item: Inventory, user: dict) -> Dict:
+def add_items_to_index(index_name: str, items: List[Inventory], user: dict) -> Dict:
     """
-    Update an item in the Elasticsearch index.
+    Add many items to the Elasticsearch index with a single bulk request.
+    """
+    try:
+        logger.info('Adding %s items to the %s index', len(items), index_name)
+
+        actions = (
+            {'_op_type': 'index', '_index': index_name, '_id': str(item.id), '_source': {**item.model_dump(), 'user_id': str(user['id'])}}
+            for item in items
+        )
+        success, errors = helpers.bulk(es, actions, raise_on_error=False)
+
+        return json.dumps({'indexed': success, 'errors': errors}, default=str)
+
+    except Exception as e:
+        logger.exception('Failed to add items to index: %s', e)
+
+
+@job('default', connection=redis_conn, timeout=500)
+def update_item_in_index(index_name: str, item: Inventory, user: dict, fields: Optional[Set[str]] = None) -> Dict:
+    """
+    Update an item in the Elasticsearch index, sending only `fields` when
+    provided.
     """
     try:
         logger.info('Updating %s in the %s index', item.id, index_name)
 
-        item_data            = item.model_dump()
+        item_data            = item.model_dump(include=fields) if fields else item.model_dump()
         item_data['user_id'] = str(user['id'])
 
         response = es.update(index=index_name, id=item.id, body={'doc': item_data})
@@ -70,3 +95,20 @@ def delete_item_in_index(index_name: str, item_id: FIMObjectID) -> Dict:
 
     except Exception as e:
         logger.exception('Failed to delete item in index: %s', e)
+
+
+@job('default', connection=redis_conn, timeout=500)
+def delete_items_in_index(index_name: str, item_ids: List[FIMObjectID]) -> Dict:
+    """
+    Delete many items in the Elasticsearch index with a single bulk request.
+    """
+    try:
+        logger.info('Deleting %s items in the %s index', len(item_ids), index_name)
+
+        actions = ({'_op_type': 'delete', '_index': index_name, '_id': str(item_id)} for item_id in item_ids)
+        success, errors = helpers.bulk(es, actions, raise_on_error=False)
+
+        return json.dumps({'deleted': success, 'errors': errors}, default=str)
+
+    except Exception as e:
+        logger.exception('Failed to delete items in index: %s', e)
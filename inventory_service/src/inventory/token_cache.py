@@ -0,0 +1,139 @@
+"""
+Two-tier cache of IAM token validations.
+
+Validations are first looked up in a small in-process LRU with a short TTL,
+then in Redis where they are shared by every inventory process. Entries are
+keyed by the token hash and never outlive the token itself. Tokens revoked
+by IAM (login, token or user deletion) are dropped on the next Redis lookup,
+so a local entry can only serve a revoked token for `local_ttl` seconds.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Dict,
+    Optional
+)
+
+from fim.authentication import revoked_token_cache_key
+from inventory import (
+    redis_conn,
+    settings
+)
+from redis import RedisError
+
+logger = settings.getLogger(__name__)
+
+
+class TokenValidationCache:
+    """
+    Cache of the IAM `/authenticate` response data, keyed by token hash
+    """
+    def __init__(self, ttl: int, local_ttl: int, local_size: int):
+        self.ttl        = ttl
+        self.local_ttl  = local_ttl
+        self.local_size = local_size
+
+        self._local = OrderedDict()
+        self._lock  = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'<TokenValidationCache ({len(self._local)} local entries)>'
+
+    @staticmethod
+    def cache_key(token_hash: str) -> str:
+        return f'{settings.SERVICE_CACHE_PREFIX}:auth-token:{token_hash}'
+
+    def _get_local(self, token_hash: str) -> Optional[str]:
+        with self._lock:
+            entry = self._local.get(token_hash)
+            if entry is None:
+                return None
+
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._local[token_hash]
+                return None
+
+            self._local.move_to_end(token_hash)
+            return payload
+
+    def _set_local(self, token_hash: str, payload: str, ttl: float) -> None:
+        with self._lock:
+            self._local[token_hash] = (time.monotonic() + min(ttl, self.local_ttl), payload)
+            self._local.move_to_end(token_hash)
+
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def get(self, token_hash: str) -> Optional[Dict]:
+        """
+        Return the cached validation of a token, if any
+        """
+        payload = self._get_local(token_hash)
+
+        if payload is None:
+            try:
+                payload, revoked = redis_conn.mget(self.cache_key(token_hash), revoked_token_cache_key(token_hash))
+            except RedisError:
+                logger.warning('Token cache unavailable, falling back to IAM')
+                return None
+
+            if revoked:
+                self.evict(token_hash)
+                return None
+
+            if payload is None:
+                return None
+
+        entry     = json.loads(payload)
+        remaining = entry['expires_at'] - time.time()
+        if remaining <= 0:
+            self.evict(token_hash)
+            return None
+
+        self._set_local(token_hash, payload, remaining)
+        return entry['auth']
+
+    def is_revoked(self, token_hash: str) -> Optional[bool]:
+        """
+        Check the shared revocation list, `None` when it can't be reached
+        """
+        try:
+            return bool(redis_conn.exists(revoked_token_cache_key(token_hash)))
+        except RedisError:
+            logger.warning('Token revocation list unavailable')
+            return None
+
+    def set(self, token_hash: str, auth_data: Dict, expires_in: int) -> None:
+        """
+        Cache a successful validation for at most the token's remaining life
+        """
+        ttl = min(self.ttl, expires_in)
+        if ttl <= 0:
+            return
+
+        payload = json.dumps({'expires_at': time.time() + ttl, 'auth': auth_data})
+        self._set_local(token_hash, payload, ttl)
+
+        try:
+            redis_conn.set(self.cache_key(token_hash), payload, ex=ttl)
+        except RedisError:
+            logger.warning('Token cache unavailable, validation only cached locally')
+
+    def evict(self, token_hash: str) -> None:
+        with self._lock:
+            self._local.pop(token_hash, None)
+
+        try:
+            redis_conn.delete(self.cache_key(token_hash))
+        except RedisError:
+            logger.warning('Token cache unavailable, could not evict token')
+
+
+token_cache = TokenValidationCache(
+    ttl=settings.AUTH_TOKEN_CACHE_SECONDS,
+    local_ttl=settings.AUTH_TOKEN_LOCAL_CACHE_SECONDS,
+    local_size=settings.AUTH_TOKEN_LOCAL_CACHE_SIZE
+)
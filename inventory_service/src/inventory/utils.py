@@ -1,17 +1,27 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    List
+)
 
+from bson import ObjectId
+from elasticsearch import helpers
+from fim import advisor
 from inventory import (
     db,
     es,
     settings
 )
+from inventory.constants import InventoryOrderOnEnum
+from inventory.models import Inventory
 
 logger = settings.getLogger(__name__)
 
 
 if TYPE_CHECKING:
+    from fim.advisor import QueryShapeReport
     from flask_pymongo import PyMongo
 
 
@@ -33,6 +43,26 @@ def setup_database_indexes(database: PyMongo = db):
                 pass
 
 
+def advise_indexes(database: PyMongo = db) -> List[QueryShapeReport]:
+    """
+    Replay the API query shapes through explain() and flag the ones that
+    scan the whole collection or sort in memory.
+    """
+    logger.info('Explaining API query shapes...')
+
+    user_id      = ObjectId()
+    order_on     = [choice.value for choice in InventoryOrderOnEnum]
+    query_shapes = {collection_name: list(shapes) for collection_name, shapes in settings.MONGO_QUERY_SHAPES.items()}
+
+    query_shapes[settings.MONGO_COLLECTION_NAME] = [
+        *advisor.list_query_shapes(Inventory, order_on=order_on, filters={'user_id': user_id}),
+        *advisor.list_query_shapes(Inventory, order_on=['id'], filters={'user_id': user_id, 'id': [1, 2]}, name='list filtered by id_in'),
+        *query_shapes.get(settings.MONGO_COLLECTION_NAME, [])
+    ]
+
+    return advisor.advise_indexes(database=database, query_shapes=query_shapes)
+
+
 def prepare_es_indexes():
     logger.info('Generating Elasticsearch indexes...')
 
@@ -43,3 +73,27 @@ def prepare_es_indexes():
             logger.info('Created index %s in Elasticsearch.', index_name)
         else:
             logger.info('Index %s already exists in Elasticsearch.', index_name)
+
+
+def rebuild_es_index(index_name: str = settings.ELASTICSEARCH_INDEX_NAME) -> Dict:
+    """
+    Drop and recreate an Elasticsearch index from its settings, then index
+    every inventory item from MongoDB again. Needed whenever the analyzers
+    or mappings of the index change.
+    """
+    logger.info('Rebuilding the %s Elasticsearch index...', index_name)
+
+    es.indices.delete(index=index_name, ignore_unavailable=True)
+    es.indices.create(index=index_name, body=settings.ELASTICSEARCH_INDEXES[index_name])
+
+    def actions():
+        for document in Inventory.collection.find():
+            item    = Inventory.from_document(document)
+            user_id = str(item.user_id) if item.user_id else None
+
+            yield {'_op_type': 'index', '_index': index_name, '_id': str(item.id), '_source': {**item.model_dump(), 'user_id': user_id}}
+
+    success, errors = helpers.bulk(es, actions(), raise_on_error=False)
+    logger.info('Indexed %s items in %s (%s errors)', success, index_name, len(errors))
+
+    return {'indexed': success, 'errors': errors}
@@ -1,19 +1,18 @@
 from inventory.app import create_app
-from rq import (
-    Connection,
-    Worker
-)
+from rq import Worker
 
 
 def start_worker():
     app = create_app()
 
     with app.app_context():
-        from inventory import redis_queue
+        from inventory import (
+            redis_conn,
+            redis_queue
+        )
 
-        with Connection():
-            worker = Worker(queues=[redis_queue], connection=redis_queue.connection)
-            worker.work()
+        worker = Worker(queues=[redis_queue], connection=redis_conn)
+        worker.work()
 
 
 if __name__ == '__main__':